@@ -0,0 +1,96 @@
+import json
+from collections import OrderedDict
+from typing import Any
+
+
+def approx_size(value: Any) -> int:
+    """Rough in-memory footprint of a json-like value, in bytes of json text."""
+    try:
+        return len(json.dumps(value, default=str))
+    except Exception:
+        return 0
+
+
+class BoundedCache:
+    """LRU mapping capped by entry count and by total approximate byte size.
+
+    Inserting past either cap evicts least-recently-used entries. hit / miss /
+    eviction counters are kept for stats(). Not thread-safe — it's only touched
+    from the event loop.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._data: OrderedDict[Any, tuple[Any, int]] = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.rejected = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self._data
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self._data.move_to_end(key)
+        return entry[0]
+
+    def peek(self, key: Any, default: Any = None) -> Any:
+        """Like get() but without touching recency or counters."""
+        entry = self._data.get(key)
+        return default if entry is None else entry[0]
+
+    def set(self, key: Any, value: Any, size: int | None = None) -> None:
+        size = approx_size(value) if size is None else size
+        self.pop(key)
+        if size > self.max_bytes:
+            # would evict everything else and still not fit
+            self.rejected += 1
+            return
+        self._data[key] = (value, size)
+        self._bytes += size
+        while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+            _, (_, evicted_size) = self._data.popitem(last=False)
+            self._bytes -= evicted_size
+            self.evictions += 1
+
+    def setdefault(self, key: Any, value: Any, size: int | None = None) -> Any:
+        if key in self._data:
+            return self.peek(key)
+        self.set(key, value, size)
+        return value
+
+    def pop(self, key: Any, default: Any = None) -> Any:
+        entry = self._data.pop(key, None)
+        if entry is None:
+            return default
+        self._bytes -= entry[1]
+        return entry[0]
+
+    def keys(self) -> list:
+        return list(self._data.keys())
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._bytes = 0
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._data),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "rejected": self.rejected,
+        }
@@ -1,5 +1,6 @@
 import json
 from functools import lru_cache
+from typing import Literal
 from pydantic_settings import BaseSettings
 
 
@@ -10,6 +11,117 @@ class Settings(BaseSettings):
     supabase_url: str = ""
     supabase_secret_key: str = ""
 
+    # max supabase calls running at once on worker threads (see database.run_query)
+    db_max_concurrency: int = 20
+
+    # how long the in-memory extensions registry is trusted before re-reading
+    # supabase — only matters for rows edited outside the hub's own endpoints
+    registry_cache_ttl_seconds: int = 60
+
+    # action_logs can be queued in-process and bulk-inserted by a background
+    # task. off by default: on hosts that freeze the process between requests
+    # (vercel) the queue would never flush, so each row is inserted inline.
+    # turn it on for long-running servers (uvicorn on a vm / container)
+    action_log_batching: bool = False
+    action_log_queue_size: int = 5000
+    action_log_batch_size: int = 200
+    action_log_flush_interval_seconds: float = 1.0
+
+    # /capabilities cache: entries older than the ttl are served stale while a
+    # background refresh runs; older than max_stale, callers wait for a fetch
+    capabilities_cache_ttl_seconds: int = 23 * 60 * 60
+    capabilities_max_stale_seconds: int = 7 * 24 * 60 * 60
+    # in-memory capabilities tier bounds (lru eviction past either limit)
+    capabilities_cache_max_entries: int = 256
+    capabilities_cache_max_bytes: int = 4 * 1024 * 1024
+
+    # per-extension circuit breaker: open after this many consecutive upstream
+    # failures, then fail fast until a probe is allowed after circuit_reset_seconds
+    circuit_failure_threshold: int = 3
+    circuit_reset_seconds: int = 30
+    # breakers kept in memory; open / half-open ones are never evicted
+    circuit_max_entries: int = 1024
+
+    # upstream admission: total in-flight requests (matches the http pool) and
+    # the most any one extension may hold; queued requests are served
+    # interactive lane first, background (reminders, capability refresh) after
+    upstream_max_in_flight: int = 100
+    upstream_per_extension_limit: int = 10
+
+    # upstream timeouts: the defaults apply until an (extension, operation)
+    # has timeout_min_samples latencies, then pct-th percentile × multiplier.
+    # always clamped to [floor, ceiling]; extensions.min_timeout_seconds /
+    # max_timeout_seconds (014) override the clamp per extension
+    adaptive_timeouts: bool = True
+    info_timeout_seconds: float = 10.0
+    execute_timeout_seconds: float = 30.0
+    timeout_window_size: int = 200
+    timeout_min_samples: int = 20
+    timeout_percentile: float = 99.0
+    timeout_multiplier: float = 3.0
+    timeout_floor_seconds: float = 2.0
+    timeout_ceiling_seconds: float = 60.0
+    # (extension url, operation) pairs with a latency window; least recently
+    # used pairs past this fall back to the defaults until they refill
+    timeout_tracker_max_keys: int = 1024
+
+    # retries for idempotent upstream calls (GET /info, /capabilities, and
+    # actions marked idempotent or read_only) on transport errors and 502/503/504,
+    # with full-jitter exponential backoff
+    upstream_retries: int = 2
+    retry_backoff_base_seconds: float = 0.2
+    retry_backoff_max_seconds: float = 2.0
+    # hedging: send a second copy of an idempotent call once the first has
+    # run longer than the op's hedge_percentile latency (never sooner than
+    # hedge_min_delay_seconds); off by default since it adds upstream load
+    upstream_hedging: bool = False
+    hedge_percentile: float = 95.0
+    hedge_min_delay_seconds: float = 0.05
+
+    # span tracing: finished spans are kept in a ring buffer (/api/traces) and,
+    # if trace_export_path is set, appended there as json lines
+    tracing_enabled: bool = True
+    trace_buffer_size: int = 5000
+    trace_export_path: str = ""
+
+    # share one upstream request between identical concurrent calls to actions
+    # that /capabilities marks read_only
+    execute_coalescing: bool = True
+
+    # check execute parameters against the action's /capabilities schema
+    # (required, type, enum) and reject bad calls without going upstream
+    parameter_validation: bool = True
+
+    # results of actions marked "cacheable" in /capabilities (lru-bounded);
+    # the default ttl applies when the action doesn't set cache_ttl_seconds
+    result_cache_default_ttl_seconds: int = 60
+    result_cache_max_entries: int = 1024
+    result_cache_max_bytes: int = 16 * 1024 * 1024
+
+    # batch execute (POST /api/extensions/batch, use_batch mcp tool)
+    batch_max_items: int = 25
+    batch_default_concurrency: int = 5
+    batch_max_concurrency: int = 10
+
+    # async execute jobs (execute?async=true, use(run_async=True)) run on
+    # job_workers in-process tasks and are held in memory only, so they are
+    # off by default: on serverless hosts (vercel) work freezes after the 202
+    # and polls can reach another instance. enable on a single long-running
+    # server. finished jobs are kept for job_retention_seconds (at most
+    # job_max_retained); status polls long-poll for up to job_max_wait_seconds;
+    # shutdown waits job_drain_timeout_seconds for unfinished jobs
+    async_jobs: bool = False
+    job_workers: int = 4
+    job_queue_size: int = 1000
+    job_retention_seconds: int = 60 * 60
+    job_max_retained: int = 1000
+    job_max_wait_seconds: float = 25.0
+    job_drain_timeout_seconds: float = 10.0
+
+    # streamed execute (?stream=true): bytes of the upstream body kept for the
+    # audit log's success/error/summary; the rest is relayed without buffering
+    stream_inspect_bytes: int = 4096
+
     # cors origins — comma-separated string or json array (pydantic-settings
     # treats json arrays as objects, so we parse it ourselves)
     cors_origins: str = "http://localhost:3000,https://jesseverse.vercel.app"
@@ -27,6 +139,13 @@ class Settings(BaseSettings):
     # bearer token for the mcp endpoint — set in .env
     mcp_token: str = "change-me"
 
+    # how /mcp serves requests:
+    #   stateless — a fresh transport + server.run per POST (serverless / vercel)
+    #   session   — one StreamableHTTPSessionManager for the process lifetime with
+    #               stateful sessions (long-running uvicorn); needs startup events,
+    #               falls back to stateless until the manager is running
+    mcp_mode: Literal["stateless", "session"] = "stateless"
+
     # secret for the vercel cron webhook (Authorization: Bearer <cron_secret>)
     cron_secret: str = "change-me"
 
@@ -1,7 +1,19 @@
+import time
+
+import anyio
 from supabase import create_client, Client
 from app.core.config import get_settings
+from app.core.metrics import REGISTRY
 
 _client: Client | None = None
+_db_limiter: anyio.CapacityLimiter | None = None
+
+_db_seconds = REGISTRY.histogram(
+    "jesseverse_db_query_seconds", "Supabase query latency, including the wait for a worker thread.",
+    ("table", "method"),
+)
+_db_errors = REGISTRY.counter("jesseverse_db_query_errors_total", "Supabase queries that raised.", ("table", "method"))
+_db_in_flight = REGISTRY.gauge("jesseverse_db_queries_in_flight", "Supabase queries currently running or queued.")
 
 
 def get_supabase() -> Client:
@@ -10,3 +22,40 @@ def get_supabase() -> Client:
         s = get_settings()
         _client = create_client(s.supabase_url, s.supabase_secret_key)
     return _client
+
+
+def _limiter() -> anyio.CapacityLimiter:
+    # created lazily so it binds to the running event loop
+    global _db_limiter
+    if _db_limiter is None:
+        _db_limiter = anyio.CapacityLimiter(get_settings().db_max_concurrency)
+    return _db_limiter
+
+
+async def run_query(query):
+    """Run a supabase-py query builder's blocking .execute() on a worker thread.
+
+    supabase-py is synchronous, so calling .execute() inside a coroutine stalls
+    the whole event loop for the duration of the PostgREST round-trip. Building
+    the query is pure and stays on the loop; only the network call is offloaded
+    to a bounded pool so a slow database can't spawn unbounded threads.
+    """
+    table, method = _query_labels(query)
+    _db_in_flight.inc()
+    started = time.perf_counter()
+    try:
+        return await anyio.to_thread.run_sync(query.execute, limiter=_limiter())
+    except Exception:
+        _db_errors.inc(table, method)
+        raise
+    finally:
+        _db_in_flight.dec()
+        _db_seconds.observe(time.perf_counter() - started, table, method)
+
+
+def _query_labels(query) -> tuple[str, str]:
+    # postgrest builders carry .request.path (…/rest/v1/<table> or …/rpc/<fn>)
+    request = getattr(query, "request", None)
+    path = str(getattr(request, "path", "") or "")
+    table = path.rsplit("/rest/v1/", 1)[-1] if "/rest/v1/" in path else "unknown"
+    return table, str(getattr(request, "http_method", "") or "unknown")
@@ -0,0 +1,196 @@
+# lightweight span tracing
+#
+# the active span lives in a contextvar, so nesting follows the call stack and
+# tasks inherit the span that was current when they were created. a trace
+# starts at the http edge (TracingMiddleware), continuing the caller's w3c
+# `traceparent` header if it sent one. the hub's http client forwards
+# `traceparent` to extensions (see trace_headers), and log_action stamps the
+# trace id on action_logs rows.
+#
+# finished spans go to an in-memory ring buffer (served at /api/traces) and,
+# when trace_export_path is set, are appended to that file as json lines —
+# both work offline, no collector needed.
+import functools
+import json
+import os
+import re
+import sys
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import get_settings
+
+_settings = get_settings()
+_current: ContextVar["Span | None"] = ContextVar("current_span", default=None)
+_finished: deque[dict] = deque(maxlen=max(1, _settings.trace_buffer_size))
+_export_file = None
+
+_TRACEPARENT_RE = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "attributes", "start", "_t0", "status", "error")
+
+    def __init__(self, name: str, trace_id: str, parent_id: str | None, attributes: dict) -> None:
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = attributes
+        self.start = time.time()
+        self._t0 = time.perf_counter()
+        self.status = "ok"
+        self.error: str | None = None
+
+    def set(self, **attributes) -> None:
+        self.attributes.update(attributes)
+
+    def fail(self, error: str) -> None:
+        self.status = "error"
+        self.error = error
+
+    def end(self) -> None:
+        record = {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.start,
+            "duration_ms": round((time.perf_counter() - self._t0) * 1000, 3),
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+        _finished.append(record)
+        if _settings.trace_export_path:
+            _export(record)
+
+
+def _export(record: dict) -> None:
+    global _export_file
+    try:
+        if _export_file is None:
+            _export_file = open(_settings.trace_export_path, "a", buffering=1, encoding="utf-8")
+        _export_file.write(json.dumps(record, default=str) + "\n")
+    except OSError as exc:
+        print(f"[tracing] export to {_settings.trace_export_path} failed: {exc}", file=sys.stderr)
+
+
+def start_span(name: str, traceparent: str | None = None, **attributes) -> Span:
+    """New span, child of the current one (or of `traceparent`, or a new root)."""
+    parent = _current.get()
+    if parent is not None:
+        return Span(name, parent.trace_id, parent.span_id, attributes)
+    match = _TRACEPARENT_RE.match(traceparent or "")
+    if match:
+        return Span(name, match.group(1), match.group(2), attributes)
+    return Span(name, os.urandom(16).hex(), None, attributes)
+
+
+@contextmanager
+def span(name: str, *, activate: bool = True, traceparent: str | None = None, **attributes):
+    """Time a block as a span. activate=False records it without making it
+    the parent of spans (and tasks) started inside the block."""
+    if not _settings.tracing_enabled:
+        yield None
+        return
+    current = start_span(name, traceparent, **attributes)
+    token = _current.set(current) if activate else None
+    try:
+        yield current
+    except BaseException as exc:
+        current.fail(str(exc) or type(exc).__name__)
+        raise
+    finally:
+        if token is not None:
+            _current.reset(token)
+        current.end()
+
+
+def traced(name: str):
+    """Decorator: run an async function inside span(name)."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            with span(name):
+                return await fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def current_span() -> Span | None:
+    return _current.get()
+
+
+def current_trace_id() -> str | None:
+    current = _current.get()
+    return current.trace_id if current is not None else None
+
+
+def trace_headers() -> dict[str, str]:
+    """`traceparent` for an outgoing request, parented to the current span."""
+    current = _current.get()
+    if current is None:
+        return {}
+    return {"traceparent": f"00-{current.trace_id}-{current.span_id}-01"}
+
+
+def recent_traces(limit: int = 20, trace_id: str | None = None) -> list[dict]:
+    """Finished spans from the ring buffer grouped by trace, newest first."""
+    traces: dict[str, list[dict]] = {}
+    # snapshot first: spans ending mid-iteration would mutate the deque
+    for record in reversed(list(_finished)):
+        if trace_id and record["trace_id"] != trace_id:
+            continue
+        spans = traces.get(record["trace_id"])
+        if spans is None:
+            if len(traces) >= limit:
+                continue
+            spans = traces[record["trace_id"]] = []
+        spans.append(record)
+    out = []
+    for tid, spans in traces.items():
+        spans.sort(key=lambda r: r["start"])
+        ids = {r["span_id"] for r in spans}
+        roots = [r for r in spans if r["parent_id"] not in ids] or spans
+        out.append({
+            "trace_id": tid,
+            "root": roots[0]["name"],
+            "start": spans[0]["start"],
+            "duration_ms": max(r["duration_ms"] for r in roots),
+            "span_count": len(spans),
+            "spans": spans,
+        })
+    return out
+
+
+class TracingMiddleware:
+    """Root span per http request; echoes the trace id as `x-trace-id`."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not _settings.tracing_enabled:
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope.get("headers") or [])
+        incoming = headers.get(b"traceparent", b"").decode("latin-1").strip().lower()
+        with span(
+            f"{scope.get('method', '')} {scope.get('path', '')}",
+            traceparent=incoming,
+        ) as root:
+            async def send_with_trace(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    root.set(status_code=message["status"])
+                    message = {
+                        **message,
+                        "headers": [*message.get("headers", []), (b"x-trace-id", root.trace_id.encode())],
+                    }
+                await send(message)
+
+            await self.app(scope, receive, send_with_trace)
@@ -0,0 +1,26 @@
+# rebuild the action_log_daily analytics rollups from raw action_logs
+#
+#   cd backend && python -m app.extensions.backfill                 # every day
+#   cd backend && python -m app.extensions.backfill --since 2025-06-01
+#
+# migration 010 runs a full rebuild once; use this after importing logs or if
+# the buckets ever drift from the raw table.
+import argparse
+import asyncio
+from datetime import date
+
+from app.extensions import service
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild action_log_daily from action_logs")
+    parser.add_argument("--since", type=date.fromisoformat, default=None, help="first UTC day to rebuild (YYYY-MM-DD)")
+    args = parser.parse_args()
+
+    since = args.since.isoformat() if args.since else None
+    buckets = asyncio.run(service.rebuild_action_log_rollups(since))
+    print(f"rebuilt {buckets} daily buckets" + (f" since {since}" if since else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# per-extension circuit breakers for upstream calls
+#
+#   closed     — calls go through; consecutive failures are counted
+#   open       — after failure_threshold failures in a row, calls fail fast
+#                with CircuitOpenError for reset_timeout seconds
+#   half_open  — once reset_timeout has passed one probe call is let through;
+#                success closes the circuit, failure re-opens it
+#
+# a "failure" is a transport error (connect / timeout / reset) or a 5xx. a 4xx
+# means the host is up and answering, so it counts as success here.
+import time
+from datetime import datetime, timezone
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    pass
+
+
+class CircuitBreaker:
+    def __init__(self, key: str, failure_threshold: int, reset_timeout: float) -> None:
+        self.key = key
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: float | None = None
+        self.last_error: str | None = None
+        self._probe_in_flight = False
+
+    def acquire(self) -> None:
+        """Raise CircuitOpenError unless a call may go upstream right now."""
+        if self.state == CLOSED:
+            return
+        if self.state == OPEN and time.time() - (self.opened_at or 0) >= self.reset_timeout:
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return
+        retry_in = max(0.0, (self.opened_at or 0) + self.reset_timeout - time.time())
+        raise CircuitOpenError(
+            f"{self.key} is unreachable ({self.consecutive_failures} consecutive failures, "
+            f"last: {self.last_error}); failing fast, retrying in {retry_in:.0f}s"
+        )
+
+    def record_success(self) -> None:
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.last_error = None
+        self._probe_in_flight = False
+
+    def record_failure(self, error: str) -> None:
+        self.consecutive_failures += 1
+        self.last_error = error
+        self._probe_in_flight = False
+        if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self.state = OPEN
+            self.opened_at = time.time()
+
+    def release(self) -> None:
+        # the call ended without an outcome (e.g. cancelled) — free the probe slot
+        self._probe_in_flight = False
+
+    def is_open(self) -> bool:
+        # an open circuit past its reset timeout is due a probe, so not "open"
+        return self.state == OPEN and time.time() - (self.opened_at or 0) < self.reset_timeout
+
+    def snapshot(self) -> dict:
+        return {
+            "state": OPEN if self.is_open() else (HALF_OPEN if self.state != CLOSED else CLOSED),
+            "consecutive_failures": self.consecutive_failures,
+            "opened_at": (
+                datetime.fromtimestamp(self.opened_at, timezone.utc).isoformat()
+                if self.opened_at else None
+            ),
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,208 @@
+# in-process async jobs for long-running extension actions
+#
+# execute?async=true and use(run_async=True) return a job id straight away; a
+# small pool of worker tasks runs the call and the outcome is kept for
+# retention_seconds after it finishes. callers poll the job (rest or the
+# get_job_result mcp tool), optionally long-polling until it is done.
+#
+# jobs only live in this process, so the mode is off unless async_jobs is set:
+# it needs a host that keeps running after the response is sent, and polls
+# that land on the same process (a single long-running server).
+import asyncio
+import contextvars
+import sys
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+class JobQueueFull(RuntimeError):
+    pass
+
+
+class Job:
+    __slots__ = (
+        "id", "extension", "action", "status", "created_at", "started_at",
+        "finished_at", "result", "error", "_run", "_done",
+    )
+
+    def __init__(self, extension: str, action: str, run: Callable[[], Awaitable[dict]]) -> None:
+        self.id = uuid.uuid4().hex
+        self.extension = extension
+        self.action = action
+        self.status = QUEUED
+        self.created_at = time.time()
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+        self.result: dict | None = None
+        self.error: str | None = None
+        self._run = run
+        self._done = asyncio.Event()
+
+    @property
+    def done(self) -> bool:
+        return self.status in (SUCCEEDED, FAILED)
+
+    def snapshot(self) -> dict:
+        """Job status as json; `result` is only present once it finished."""
+        out = {
+            "job_id": self.id,
+            "extension": self.extension,
+            "action": self.action,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+        }
+        if self.done:
+            out["result"] = self.result
+        return out
+
+
+class JobRunner:
+    def __init__(
+        self,
+        *,
+        workers: int = 4,
+        max_queue: int = 1000,
+        retention_seconds: float = 3600,
+        max_retained: int = 1000,
+    ) -> None:
+        self._workers = max(1, workers)
+        self._max_queue = max_queue
+        self._retention = retention_seconds
+        self._max_retained = max_retained
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+        self._queue: asyncio.Queue[Job] | None = None
+        self._tasks: list[asyncio.Task] = []
+        self._loop: asyncio.AbstractEventLoop | None = None
+        # counters (see stats())
+        self.submitted = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.rejected = 0
+
+    def stats(self) -> dict:
+        by_status = {QUEUED: 0, RUNNING: 0, SUCCEEDED: 0, FAILED: 0}
+        for job in self._jobs.values():
+            by_status[job.status] += 1
+        return {
+            **by_status,
+            "submitted": self.submitted,
+            "completed_ok": self.succeeded,
+            "completed_failed": self.failed,
+            "rejected": self.rejected,
+        }
+
+    def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        # asyncio queues are bound to one loop — rebuild if the loop changed
+        if self._loop is not loop:
+            self._queue = asyncio.Queue(maxsize=self._max_queue)
+            self._loop = loop
+            self._tasks = []
+        self._tasks = [t for t in self._tasks if not t.done()]
+        while len(self._tasks) < self._workers:
+            # a fresh context: workers outlive the request that started them
+            # and must not inherit its contextvars (e.g. the active span)
+            self._tasks.append(loop.create_task(self._work(), context=contextvars.Context()))
+
+    def submit(self, extension: str, action: str, run: Callable[[], Awaitable[dict]]) -> Job:
+        """Queue `run` (which returns the execute result) and return its job.
+        Raises JobQueueFull when max_queue jobs are already waiting."""
+        self.start()
+        self._prune()
+        job = Job(extension, action, run)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise JobQueueFull(f"job queue is full ({self._max_queue} waiting); try again shortly")
+        self._jobs[job.id] = job
+        self.submitted += 1
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        self._prune()
+        return self._jobs.get(job_id)
+
+    async def wait(self, job_id: str, timeout: float) -> Job | None:
+        """The job once it finished, or as it stands after `timeout` seconds."""
+        job = self.get(job_id)
+        if job is None or job.done or timeout <= 0:
+            return job
+        try:
+            await asyncio.wait_for(job._done.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return job
+
+    async def drain(self, timeout: float) -> None:
+        """Give queued and running jobs up to `timeout` seconds to finish, then
+        stop the workers; whatever is left is marked failed."""
+        if self._queue is not None and self._tasks:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout)
+            except asyncio.TimeoutError:
+                print(f"[jobs] drain timed out after {timeout}s; abandoning unfinished jobs", file=sys.stderr)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._queue is not None:
+            while not self._queue.empty():
+                self._finish(self._queue.get_nowait(), False, "hub shut down before the job ran")
+                self._queue.task_done()
+
+    def _prune(self) -> None:
+        # drop finished jobs past retention, then the oldest finished ones
+        # beyond max_retained; queued and running jobs are always kept
+        cutoff = time.time() - self._retention
+        finished = [job for job in self._jobs.values() if job.done]
+        excess = len(self._jobs) - self._max_retained
+        for job in finished:
+            if job.finished_at < cutoff or excess > 0:
+                del self._jobs[job.id]
+                excess -= 1
+
+    async def _work(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._execute(job)
+            finally:
+                self._queue.task_done()
+
+    async def _execute(self, job: Job) -> None:
+        job.status = RUNNING
+        job.started_at = time.time()
+        try:
+            job.result = await job._run()
+            ok = bool(job.result.get("success", True))
+            job.error = None if ok else job.result.get("error")
+        except asyncio.CancelledError:
+            self._finish(job, False, "hub shut down while the job was running")
+            raise
+        except Exception as exc:
+            ok = False
+            job.error = str(exc) or type(exc).__name__
+            print(f"[jobs] {job.extension}.{job.action} ({job.id}) failed: {job.error}", file=sys.stderr)
+        self._finish(job, ok, job.error)
+
+    def _finish(self, job: Job, ok: bool, error: str | None) -> None:
+        job.status = SUCCEEDED if ok else FAILED
+        job.error = error
+        if ok:
+            self.succeeded += 1
+        else:
+            self.failed += 1
+        job.finished_at = time.time()
+        job._run = None  # drop the closure (and its parameters)
+        job._done.set()
@@ -0,0 +1,93 @@
+# adaptive upstream timeouts
+#
+# each (extension url, operation) keeps a rolling window of observed request
+# latencies — operation is "info", "capabilities" or "execute:<action>". once
+# a window has min_samples, the timeout for the next call is
+#
+#     percentile(window, pct) * multiplier
+#
+# clamped to [floor, ceiling]. until then the fixed cold-start default is used
+# (still clamped). timeouts are recorded at the elapsed time, so a host that
+# keeps timing out pushes its own budget up towards the ceiling rather than
+# staying stuck at a deadline it can't meet.
+import math
+import sys
+from collections import deque
+
+from app.core.cache import BoundedCache
+
+
+def _percentile(ordered: list[float], pct: float) -> float:
+    idx = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[idx]
+
+
+class LatencyTracker:
+    def __init__(
+        self,
+        *,
+        window: int,
+        min_samples: int,
+        percentile: float,
+        multiplier: float,
+        floor: float,
+        ceiling: float,
+        max_keys: int,
+        adaptive: bool = True,
+    ) -> None:
+        self.window = window
+        self.min_samples = min_samples
+        self.percentile = percentile
+        self.multiplier = multiplier
+        self.floor = floor
+        self.ceiling = ceiling
+        self.adaptive = adaptive
+        # op names come from callers (any action string), so bound the keys
+        self._windows = BoundedCache(max_entries=max_keys, max_bytes=sys.maxsize)
+
+    def record(self, url: str, op: str, seconds: float) -> None:
+        samples = self._windows.peek((url, op))
+        if samples is None:
+            samples = deque(maxlen=self.window)
+            self._windows.set((url, op), samples, size=0)
+        samples.append(seconds)
+
+    def quantile(self, url: str, op: str, pct: float) -> float | None:
+        """pct-th percentile latency, or None until the window has min_samples."""
+        samples = self._windows.peek((url, op))
+        if samples is None or len(samples) < self.min_samples:
+            return None
+        return _percentile(sorted(samples), pct)
+
+    def timeout(
+        self,
+        url: str,
+        op: str,
+        default: float,
+        floor: float | None = None,
+        ceiling: float | None = None,
+    ) -> float:
+        """Deadline in seconds for the next call; floor/ceiling override the global clamp."""
+        lo = self.floor if floor is None else floor
+        hi = max(lo, self.ceiling if ceiling is None else ceiling)
+        value = default
+        samples = self._windows.peek((url, op))
+        if self.adaptive and samples is not None and len(samples) >= self.min_samples:
+            value = _percentile(sorted(samples), self.percentile) * self.multiplier
+        return min(max(value, lo), hi)
+
+    def snapshot(self, url: str, defaults: dict[str, float], floor: float | None = None, ceiling: float | None = None) -> dict:
+        """Latency budget per operation seen for url (plus the defaults' ops)."""
+        ops = {op for key_url, op in self._windows.keys() if key_url == url} | set(defaults)
+        out = {}
+        for op in sorted(ops):
+            samples = self._windows.peek((url, op))
+            ordered = sorted(samples) if samples else []
+            default = defaults.get(op) or defaults.get(op.split(":", 1)[0], self.ceiling)
+            out[op] = {
+                "samples": len(ordered),
+                "p50_ms": round(_percentile(ordered, 50) * 1000, 1) if ordered else None,
+                "p99_ms": round(_percentile(ordered, 99) * 1000, 1) if ordered else None,
+                "timeout_seconds": round(self.timeout(url, op, default, floor, ceiling), 2),
+            }
+        return out
@@ -0,0 +1,123 @@
+# background writer for action_logs
+#
+# log_action() used to await a single-row insert on every execute, which put a
+# full supabase round-trip on the caller's critical path. rows now go into a
+# bounded in-process queue and a background task flushes them as one bulk
+# insert whenever batch_size rows are waiting or flush_interval has elapsed.
+import asyncio
+import sys
+from collections.abc import Awaitable, Callable
+
+
+class ActionLogWriter:
+    def __init__(
+        self,
+        sink: Callable[[list[dict]], Awaitable[None]],
+        *,
+        max_queue: int = 5000,
+        batch_size: int = 200,
+        flush_interval: float = 1.0,
+        put_timeout: float = 0.05,
+    ) -> None:
+        self._sink = sink
+        self._max_queue = max_queue
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._put_timeout = put_timeout
+        self._queue: asyncio.Queue[dict] | None = None
+        self._task: asyncio.Task | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._closing = False
+        # counters (see stats())
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.flushes = 0
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "flushes": self.flushes,
+        }
+
+    def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._task is not None and not self._task.done() and self._loop is loop:
+            return
+        # asyncio queues are bound to one loop — rebuild if the loop changed
+        if self._loop is not loop:
+            self._queue = asyncio.Queue(maxsize=self._max_queue)
+            self._loop = loop
+        self._closing = False
+        self._task = loop.create_task(self._run())
+
+    async def submit(self, row: dict) -> bool:
+        """Queue one row. Waits up to put_timeout for space when the queue is
+        full (backpressure), then drops the row. Returns False if dropped."""
+        if self._closing:
+            # shutting down — nobody will flush the queue, write directly
+            await self._write([row])
+            return True
+        self.start()
+        try:
+            self._queue.put_nowait(row)
+        except asyncio.QueueFull:
+            try:
+                await asyncio.wait_for(self._queue.put(row), self._put_timeout)
+            except asyncio.TimeoutError:
+                self.dropped += 1
+                print(
+                    f"[log_writer] queue full ({self._max_queue}), dropped audit row "
+                    f"for {row.get('extension_name')}.{row.get('action')} (dropped={self.dropped})",
+                    file=sys.stderr,
+                )
+                return False
+        self.enqueued += 1
+        return True
+
+    async def drain(self) -> None:
+        """Flush everything still queued and stop the background task."""
+        self._closing = True
+        if self._task is not None:
+            await self._task
+            self._task = None
+
+    async def _run(self) -> None:
+        while not (self._closing and self._queue.empty()):
+            batch = await self._collect()
+            if batch:
+                await self._write(batch)
+
+    async def _collect(self) -> list[dict]:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self._flush_interval
+        batch: list[dict] = []
+        while len(batch) < self._batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - loop.time()
+            if self._closing or remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _write(self, batch: list[dict]) -> None:
+        try:
+            await self._sink(batch)
+            self.written += len(batch)
+        except Exception as exc:
+            self.failed += len(batch)
+            print(f"[log_writer] FAILED to write {len(batch)} audit rows: {exc}", file=sys.stderr)
+        finally:
+            self.flushes += 1
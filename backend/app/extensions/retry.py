@@ -0,0 +1,65 @@
+# retry + hedging primitives for idempotent upstream requests
+#
+# retries use "full jitter" backoff: attempt n sleeps uniform(0, min(cap,
+# base * 2**n)), which spreads a burst of failing callers out instead of
+# having them hammer a cold-starting backend in lockstep.
+#
+# a hedged request starts one attempt, and if it hasn't finished after
+# `delay` (the op's p95 latency) starts a second one; whichever succeeds first
+# wins and the other is cancelled. this trims the slow tail at the cost of a
+# few % extra requests, so it is only used for requests that are safe to send
+# twice.
+import asyncio
+import random
+from typing import Awaitable, Callable, TypeVar
+
+T = TypeVar("T")
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class RetryStats:
+    def __init__(self) -> None:
+        self.retries = 0            # extra attempts after a retryable failure
+        self.retry_successes = 0    # calls that succeeded on a retry
+        self.retries_exhausted = 0  # calls that failed after every attempt
+        self.hedges = 0             # second requests sent by the hedge timer
+        self.hedge_wins = 0         # ... that answered before the original
+
+    def snapshot(self) -> dict:
+        return dict(vars(self))
+
+
+async def hedged(
+    attempt: Callable[[], Awaitable[T]],
+    delay: float | None,
+    stats: RetryStats,
+) -> T:
+    """Run attempt(); if it is still pending after delay, race a second one."""
+    if delay is None:
+        return await attempt()
+    first = asyncio.ensure_future(attempt())
+    pending = {first}
+    error: BaseException | None = None
+    try:
+        done, pending = await asyncio.wait(pending, timeout=delay)
+        if done:
+            return first.result()
+
+        stats.hedges += 1
+        second = asyncio.ensure_future(attempt())
+        pending = {first, second}
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is second:
+                        stats.hedge_wins += 1
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
@@ -1,8 +1,14 @@
+import time
+
+import anyio
 from fastapi import APIRouter, HTTPException, Depends, Query
-from pydantic import BaseModel
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, Field
 from app.extensions import service
+from app.extensions.jobs import JobQueueFull
+from app.extensions.summarize import summarize
 from app.core.auth import require_api_key
-import json
+from app.core.config import get_settings
 
 router = APIRouter()
 
@@ -20,6 +26,19 @@ class ExecuteBody(BaseModel):
     source: str = "hub"         # 'claude' | 'hub'
 
 
+class BatchItem(BaseModel):
+    extension: str
+    action: str
+    parameters: dict = {}
+
+
+class BatchBody(BaseModel):
+    items: list[BatchItem]
+    concurrency: int | None = None  # capped by settings.batch_max_concurrency
+    prompt: str | None = None
+    source: str = "hub"
+
+
 class UpdateBody(BaseModel):
     name: str | None = None
     url: str | None = None
@@ -28,13 +47,15 @@ class UpdateBody(BaseModel):
     supabase_url: str | None = None
     vercel_url: str | None = None
     visibility: str | None = None
+    min_timeout_seconds: float | None = Field(None, gt=0)  # per-extension timeout clamp
+    max_timeout_seconds: float | None = Field(None, gt=0)
 
 
 # ── read-only (no auth required) ─────────────────────────────────────────────────────
 
 @router.get("")
-def list_extensions():
-    return service.list_extensions()
+async def list_extensions():
+    return await service.list_extensions()
 
 
 @router.get("/register")
@@ -52,7 +73,8 @@ async def register_preview(url: str = Query(..., description="Base URL of the ex
                 detail=f"/info response is missing required field: '{field}'",
             )
     try:
-        capabilities = await service.fetch_capabilities(clean_url)
+        # not registered yet — cache in memory only, keep it out of the db tier
+        capabilities = await service.fetch_capabilities(clean_url, persist=False)
     except Exception as e:
         raise HTTPException(status_code=502, detail=f"Could not reach {clean_url}/capabilities: {e}")
     if not isinstance(capabilities, list):
@@ -77,7 +99,7 @@ async def register_extension(body: RegisterBody):
                 status_code=422,
                 detail=f"/info response is missing required field: '{field}'",
             )
-    return service.register_extension(
+    return await service.register_extension(
         name=body.name,
         url=body.url,
         description=info.get("description", body.description),
@@ -90,97 +112,261 @@ async def register_extension(body: RegisterBody):
 
 
 @router.patch("/{name}", dependencies=[Depends(require_api_key)])
-def patch_extension(name: str, body: UpdateBody):
-    if not service.get_extension(name):
+async def patch_extension(name: str, body: UpdateBody):
+    if not await service.get_extension(name):
         raise HTTPException(status_code=404, detail="Extension not found")
     updates = {k: v for k, v in body.model_dump().items() if v is not None}
     if not updates:
         raise HTTPException(status_code=400, detail="No fields to update")
-    return service.update_extension(name, updates)
+    return await service.update_extension(name, updates)
 
 
 @router.delete("/{name}", status_code=204, dependencies=[Depends(require_api_key)])
-def delete_extension(name: str):
-    if not service.get_extension(name):
+async def delete_extension(name: str):
+    if not await service.get_extension(name):
         raise HTTPException(status_code=404, detail="Extension not found")
-    service.delete_extension(name)
+    await service.delete_extension(name)
 
 
 @router.post("/{name}/execute", dependencies=[Depends(require_api_key)])
-async def execute_action(name: str, body: ExecuteBody):
+async def execute_action(
+    name: str,
+    body: ExecuteBody,
+    stream: bool = Query(False, description="Relay the upstream body as it arrives instead of buffering it"),
+    run_async: bool = Query(False, alias="async", description="Run as a background job and return its id (202)"),
+):
     # proxy the action to the registered extension
-    ext = service.get_extension(name)
+    ext = await service.get_extension(name)
     if not ext:
-        known = [e["name"] for e in service.list_extensions()]
+        known = [e["name"] for e in await service.list_extensions()]
         raise HTTPException(
             status_code=404,
             detail=f"Extension '{name}' not found. Registered: {', '.join(known) or 'none'}",
         )
     try:
-        result = await service.proxy_execute(ext["url"], body.action, body.parameters)
+        caps = await service.fetch_capabilities(ext["url"], use_cache=True)
+    except Exception:
+        caps = None  # unknown — no validation, caching or coalescing
+    invalid = service.validate_parameters(ext["url"], caps, body.action, body.parameters)
+    if invalid:
+        await service.log_action(
+            extension_name=name, action=body.action, params=body.parameters,
+            success=False, error=invalid, prompt=body.prompt, source=body.source,
+        )
+        raise HTTPException(status_code=422, detail=invalid)
+    if run_async:
+        if not get_settings().async_jobs:
+            raise HTTPException(
+                status_code=501,
+                detail="async jobs are disabled on this server (set ASYNC_JOBS=true on a long-running host)",
+            )
+        if stream:
+            raise HTTPException(status_code=400, detail="async and stream can't be combined")
+        try:
+            job = service.submit_job(
+                name, ext["url"], body.action, body.parameters,
+                service.find_capability(caps, body.action),
+                prompt=body.prompt, source=body.source,
+            )
+        except JobQueueFull as e:
+            raise HTTPException(status_code=503, detail=str(e))
+        return JSONResponse(
+            status_code=202,
+            content={**job.snapshot(), "status_url": f"/api/extensions/jobs/{job.id}"},
+        )
+    if stream:
+        return await _stream_execute(name, ext, body, service.find_capability(caps, body.action))
+    request_bytes = service.execute_request_bytes(body.action, body.parameters)
+    started = time.perf_counter()
+    try:
+        result, cache_hit, response_bytes = await service.run_action(
+            ext["url"], body.action, body.parameters,
+            service.find_capability(caps, body.action),
+        )
     except Exception as e:
-        service.log_action(
+        await service.log_action(
             extension_name=name, action=body.action, params=body.parameters,
             success=False, error=str(e), prompt=body.prompt, source=body.source,
+            duration_ms=service.elapsed_ms(started), request_bytes=request_bytes,
         )
         raise HTTPException(status_code=502, detail=str(e))
+    duration_ms = service.elapsed_ms(started)
 
-    # build a compact result_summary (≤500 chars) for the log
-    result_summary: str | None = None
-    if result.get("data") is not None:
-        try:
-            serialized = json.dumps(result["data"], default=str)
-            result_summary = serialized[:500] + ("…" if len(serialized) > 500 else "")
-        except Exception:
-            pass
-
-    service.log_action(
+    await service.log_action(
         extension_name=name, action=body.action, params=body.parameters,
         success=result.get("success", True),
         error=result.get("error"),
-        result_summary=result_summary,
+        # compact ≤500-char prefix, built without serializing the whole result
+        result_summary=summarize(result.get("data")),
         prompt=body.prompt,
         source=body.source,
+        cache_hit=cache_hit,
+        duration_ms=duration_ms,
+        request_bytes=request_bytes,
+        response_bytes=response_bytes,
     )
     return result
 
 
+async def _stream_execute(
+    name: str, ext: dict, body: ExecuteBody, capability: dict | None,
+) -> StreamingResponse:
+    # pass-through mode: no result cache / coalescing, and only the first
+    # stream_inspect_bytes of the body are kept to build the audit row.
+    # duration_ms covers the whole relay, up to the last byte
+    request_bytes = service.execute_request_bytes(body.action, body.parameters)
+    started = time.perf_counter()
+    try:
+        resp = await service.open_execute_stream(ext["url"], body.action, body.parameters)
+    except Exception as e:
+        await service.log_action(
+            extension_name=name, action=body.action, params=body.parameters,
+            success=False, error=str(e), prompt=body.prompt, source=body.source,
+            duration_ms=service.elapsed_ms(started), request_bytes=request_bytes,
+        )
+        raise HTTPException(status_code=502, detail=str(e))
+
+    inspect_bytes = get_settings().stream_inspect_bytes
+
+    async def relay():
+        prefix = bytearray()
+        complete = False
+        relayed = 0
+        try:
+            async for chunk in resp.aiter_bytes():
+                relayed += len(chunk)
+                if len(prefix) < inspect_bytes:
+                    prefix += chunk[: inspect_bytes - len(prefix)]
+                yield chunk
+            complete = len(prefix) < inspect_bytes
+        finally:
+            # a client disconnect cancels this generator; shield the cleanup
+            # so the audit row is still written
+            with anyio.CancelScope(shield=True):
+                await resp.aclose()
+                success, error, result_summary = service.inspect_execute_prefix(bytes(prefix), complete)
+                if success:
+                    service.note_successful_call(ext["url"], capability)
+                await service.log_action(
+                    extension_name=name, action=body.action, params=body.parameters,
+                    success=success, error=error, result_summary=result_summary,
+                    prompt=body.prompt, source=body.source,
+                    duration_ms=service.elapsed_ms(started),
+                    request_bytes=request_bytes, response_bytes=relayed,
+                )
+
+    return StreamingResponse(
+        relay(),
+        media_type=resp.headers.get("content-type", "application/json"),
+    )
+
+
+@router.post("/batch", dependencies=[Depends(require_api_key)])
+async def execute_batch(body: BatchBody):
+    # runs every item concurrently; per-item failures are reported, not raised
+    max_items = get_settings().batch_max_items
+    if not body.items:
+        raise HTTPException(status_code=400, detail="No items to execute")
+    if len(body.items) > max_items:
+        raise HTTPException(status_code=422, detail=f"Batch too large: {len(body.items)} items (max {max_items})")
+    results = await service.run_batch(
+        [item.model_dump() for item in body.items],
+        concurrency=body.concurrency,
+        source=body.source,
+        prompt=body.prompt,
+    )
+    return {"results": results}
+
+
 @router.get("/logs")
-def get_all_logs(
+async def get_all_logs(
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
     extension_name: str | None = Query(None),
     source: str | None = Query(None),
     success: bool | None = Query(None),
+    cursor: str | None = Query(None, description="next_cursor from the previous page; overrides offset"),
+    include_total: bool | None = Query(None, description="Count all matching rows (default: on for offset paging, off with a cursor)"),
 ):
-    return service.get_all_action_logs(
-        limit=limit,
-        offset=offset,
-        extension_name=extension_name,
-        source=source,
-        success=success,
-    )
+    try:
+        return await service.get_all_action_logs(
+            limit=limit,
+            offset=offset,
+            extension_name=extension_name,
+            source=source,
+            success=success,
+            cursor=cursor,
+            include_total=cursor is None if include_total is None else include_total,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/logs/analytics")
-def get_logs_analytics(
+async def get_logs_analytics(
     days: int = Query(30, ge=1, le=365),
     extension_name: str | None = Query(None),
     source: str | None = Query(None),
 ):
-    return service.get_action_log_analytics(
+    return await service.get_action_log_analytics(
         days=days,
         extension_name=extension_name,
         source=source,
     )
 
 
+# ── async jobs (execute?async=true) ───────────────────────────────────────────
+
+def _wait_seconds(wait: float) -> float:
+    return min(max(wait, 0.0), get_settings().job_max_wait_seconds)
+
+
+@router.get("/jobs/{job_id}", dependencies=[Depends(require_api_key)])
+async def get_job(
+    job_id: str,
+    wait: float = Query(0, ge=0, description="Long-poll: seconds to wait for the job to finish"),
+):
+    # status, plus the execute result once the job has finished
+    job = await service.job_runner.wait(job_id, _wait_seconds(wait))
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found (unknown id, or expired)")
+    return job.snapshot()
+
+
+@router.get("/jobs/{job_id}/result", dependencies=[Depends(require_api_key)])
+async def get_job_result(
+    job_id: str,
+    wait: float = Query(0, ge=0, description="Long-poll: seconds to wait for the job to finish"),
+):
+    # the execute result, shaped like a synchronous call; 202 + status while
+    # the job is still queued or running, 502 if the call itself failed
+    job = await service.job_runner.wait(job_id, _wait_seconds(wait))
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found (unknown id, or expired)")
+    if not job.done:
+        return JSONResponse(status_code=202, content=job.snapshot())
+    if job.result is None:
+        raise HTTPException(status_code=502, detail=job.error)
+    return job.result
+
+
 @router.get("/{name}/logs")
-def get_logs(
+async def get_logs(
     name: str,
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: str | None = Query(None, description="next_cursor from the previous page; overrides offset"),
+    include_total: bool | None = Query(None, description="Count all matching rows (default: on for offset paging, off with a cursor)"),
 ):
-    if not service.get_extension(name):
+    if not await service.get_extension(name):
         raise HTTPException(status_code=404, detail="Extension not found")
-    return service.get_action_logs(name, limit=limit, offset=offset)
+    try:
+        return await service.get_action_logs(
+            name,
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
+            include_total=cursor is None if include_total is None else include_total,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
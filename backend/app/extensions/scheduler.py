@@ -0,0 +1,127 @@
+# admission control in front of the shared httpx client
+#
+# every upstream request takes a slot first. slots are limited globally (the
+# connection pool size) and per extension, so one chatty or slow backend can't
+# occupy the whole pool. when slots run out, waiters are served by lane
+# priority — interactive executes before background polling — and FIFO within
+# a lane. a waiter blocked only by its own extension's limit doesn't hold up
+# waiters for other extensions.
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+LANES = (INTERACTIVE, BACKGROUND)  # highest priority first
+
+
+class _LaneStats:
+    def __init__(self) -> None:
+        self.in_flight = 0
+        self.admitted = 0
+        self.waited = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+
+class UpstreamScheduler:
+    def __init__(self, max_in_flight: int, per_extension: int) -> None:
+        self.max_in_flight = max_in_flight
+        self.per_extension = per_extension
+        self._in_flight = 0
+        self._by_key: dict[str, int] = {}
+        self._waiters: dict[str, deque[tuple[str, asyncio.Future, float]]] = {
+            lane: deque() for lane in LANES
+        }
+        self._lanes = {lane: _LaneStats() for lane in LANES}
+
+    def _can_run(self, key: str) -> bool:
+        return self._in_flight < self.max_in_flight and self._by_key.get(key, 0) < self.per_extension
+
+    def _grant(self, key: str, lane: str) -> None:
+        self._in_flight += 1
+        self._by_key[key] = self._by_key.get(key, 0) + 1
+        stats = self._lanes[lane]
+        stats.in_flight += 1
+        stats.admitted += 1
+
+    def _release(self, key: str, lane: str) -> None:
+        self._in_flight -= 1
+        remaining = self._by_key.get(key, 1) - 1
+        if remaining:
+            self._by_key[key] = remaining
+        else:
+            self._by_key.pop(key, None)
+        self._lanes[lane].in_flight -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        for lane in LANES:
+            queue = self._waiters[lane]
+            for entry in list(queue):
+                if self._in_flight >= self.max_in_flight:
+                    return
+                key, fut, _ = entry
+                if fut.done():
+                    queue.remove(entry)
+                    continue
+                if self._by_key.get(key, 0) < self.per_extension:
+                    queue.remove(entry)
+                    self._grant(key, lane)
+                    fut.set_result(None)
+
+    def _has_waiters(self, upto_lane: str) -> bool:
+        for lane in LANES:
+            if self._waiters[lane]:
+                return True
+            if lane == upto_lane:
+                return False
+        return False
+
+    @asynccontextmanager
+    async def slot(self, key: str, lane: str = INTERACTIVE):
+        stats = self._lanes[lane]
+        if self._can_run(key) and not self._has_waiters(lane):
+            self._grant(key, lane)
+        else:
+            fut = asyncio.get_running_loop().create_future()
+            entry = (key, fut, time.monotonic())
+            self._waiters[lane].append(entry)
+            self._dispatch()
+            try:
+                await fut
+            except asyncio.CancelledError:
+                if fut.done() and not fut.cancelled():
+                    # granted in the same tick we were cancelled — give it back
+                    self._release(key, lane)
+                elif entry in self._waiters[lane]:
+                    self._waiters[lane].remove(entry)
+                raise
+            waited = time.monotonic() - entry[2]
+            stats.waited += 1
+            stats.wait_seconds += waited
+            stats.max_wait_seconds = max(stats.max_wait_seconds, waited)
+        try:
+            yield
+        finally:
+            self._release(key, lane)
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": self._in_flight,
+            "max_in_flight": self.max_in_flight,
+            "per_extension_limit": self.per_extension,
+            "in_flight_by_extension": dict(self._by_key),
+            "lanes": {
+                lane: {
+                    "queue_depth": len(self._waiters[lane]),
+                    "in_flight": s.in_flight,
+                    "admitted": s.admitted,
+                    "waited": s.waited,
+                    "avg_wait_ms": round(s.wait_seconds / s.waited * 1000, 2) if s.waited else 0.0,
+                    "max_wait_ms": round(s.max_wait_seconds * 1000, 2),
+                }
+                for lane, s in self._lanes.items()
+            },
+        }
@@ -0,0 +1,120 @@
+# inverted index over extension capabilities, for the search_capabilities tool
+#
+# one document per (extension, action). fields are tokenized separately and
+# weighted — action name > description > extension name/title > parameters —
+# and documents are ranked with bm25 over the weighted term frequencies.
+# query terms that match nothing exactly fall back to vocabulary prefixes, so
+# "remind" still finds "reminders".
+import math
+import re
+from bisect import bisect_left
+from collections import defaultdict
+
+_WORD_RE = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|[0-9]+")
+
+# field weights for term frequency
+NAME_WEIGHT = 3.0
+DESCRIPTION_WEIGHT = 1.0
+EXTENSION_WEIGHT = 1.0
+PARAMETER_WEIGHT = 0.5
+
+_PREFIX_MIN_CHARS = 3
+_PREFIX_PENALTY = 0.5
+_K1 = 1.2
+_B = 0.75
+
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from get in into is it of on or the this to with".split()
+)
+
+
+def _stem(token: str) -> str:
+    # just enough to line up plurals ("reminders" / "reminder", "entries" / "entry")
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercased, stemmed words; splits snake_case, kebab-case and camelCase."""
+    tokens = []
+    for word in _WORD_RE.findall(text or ""):
+        word = word.lower()
+        if word not in _STOPWORDS:
+            tokens.append(_stem(word))
+    return tokens
+
+
+def _parameter_text(parameters: list[dict]) -> str:
+    parts = []
+    for p in parameters or []:
+        if not isinstance(p, dict):
+            continue
+        parts.append(str(p.get("name", "")))
+        parts.append(str(p.get("description", "")))
+        parts.extend(str(v) for v in p.get("enum") or [])
+    return " ".join(parts)
+
+
+class CapabilityIndex:
+    """Immutable once built: add() every action, then search()."""
+
+    def __init__(self) -> None:
+        self.documents: list[tuple[dict, dict]] = []  # (extension row, capability)
+        self._postings: dict[str, dict[int, float]] = defaultdict(dict)
+        self._lengths: list[float] = []
+        self._vocabulary: list[str] | None = None
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def add(self, extension: dict, capability: dict) -> None:
+        doc_id = len(self.documents)
+        self.documents.append((extension, capability))
+        weighted: dict[str, float] = defaultdict(float)
+        for text, weight in (
+            (capability.get("name", ""), NAME_WEIGHT),
+            (capability.get("description", ""), DESCRIPTION_WEIGHT),
+            (f"{extension.get('name', '')} {extension.get('title', '')}", EXTENSION_WEIGHT),
+            (_parameter_text(capability.get("parameters")), PARAMETER_WEIGHT),
+        ):
+            for token in tokenize(str(text)):
+                weighted[token] += weight
+        for token, tf in weighted.items():
+            self._postings[token][doc_id] = tf
+        self._lengths.append(sum(weighted.values()))
+        self._vocabulary = None
+
+    def _expand(self, term: str) -> list[tuple[str, float]]:
+        # exact term, else every vocabulary word it prefixes (at a discount)
+        if term in self._postings:
+            return [(term, 1.0)]
+        if len(term) < _PREFIX_MIN_CHARS:
+            return []
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        matches = []
+        i = bisect_left(self._vocabulary, term)
+        while i < len(self._vocabulary) and self._vocabulary[i].startswith(term):
+            matches.append((self._vocabulary[i], _PREFIX_PENALTY))
+            i += 1
+        return matches
+
+    def search(self, query: str, limit: int = 10) -> list[tuple[float, dict, dict]]:
+        """Top `limit` (score, extension row, capability), best first."""
+        if not self.documents:
+            return []
+        count = len(self.documents)
+        avg_length = sum(self._lengths) / count or 1.0
+        scores: dict[int, float] = defaultdict(float)
+        for term in dict.fromkeys(tokenize(query)):
+            for token, factor in self._expand(term):
+                postings = self._postings[token]
+                idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, tf in postings.items():
+                    norm = _K1 * (1 - _B + _B * self._lengths[doc_id] / avg_length)
+                    scores[doc_id] += factor * idf * tf * (_K1 + 1) / (tf + norm)
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:max(0, limit)]
+        return [(score, *self.documents[doc_id]) for doc_id, score in ranked]
@@ -4,42 +4,112 @@
 #   get  {url}/info          →  { title, description, version, author?, icon_url?, homepage_url? }
 #   get  {url}/capabilities  →  [{ name, description, parameters: [{name, type, required}] }]
 #   post {url}/execute       →  body: { action, parameters }  ⇒  { success, data?, error? }
+import base64
+import hashlib
 import json
+import math
+import re
 import sys
+import uuid
 import httpx
 import time
 import asyncio
 from collections import Counter
+from collections.abc import Awaitable, Callable
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone, timedelta
-from app.core.database import get_supabase
+from app.core.cache import BoundedCache
+from app.core.config import get_settings
+from app.core.database import get_supabase, run_query
+from app.core.metrics import REGISTRY
+from app.core.tracing import current_trace_id, span, trace_headers, traced
+from app.extensions.circuit import CLOSED, CircuitBreaker
+from app.extensions.jobs import Job, JobRunner
+from app.extensions.latency import LatencyTracker
+from app.extensions.scheduler import BACKGROUND, INTERACTIVE, UpstreamScheduler
+from app.extensions.log_writer import ActionLogWriter
+from app.extensions.retry import RetryStats, backoff_delay, hedged
+from app.extensions.summarize import SUMMARY_CHARS, summarize
+from app.extensions.validation import ParameterValidator, format_errors
+
+_settings = get_settings()
 
 
 # ── Registry (Supabase) ───────────────────────────────────────────────────────
+# the whole extensions table is held as one in-memory snapshot (name → row).
+# hub writes patch the snapshot in place; changes made directly in supabase
+# show up once the snapshot is older than registry_cache_ttl_seconds.
 
-def list_extensions() -> list[dict]:
-    db = get_supabase()
-    exts = db.table("extensions").select("*").execute().data or []
+_registry_snapshot: tuple[float, dict[str, dict]] | None = None
+_registry_version = 0  # bumped on every snapshot change (reload or write)
+_registry_lock = asyncio.Lock()
+
+
+async def _registry() -> dict[str, dict]:
+    global _registry_snapshot, _registry_version
+    ttl = get_settings().registry_cache_ttl_seconds
+
+    snapshot = _registry_snapshot
+    if snapshot is not None and time.monotonic() - snapshot[0] <= ttl:
+        return snapshot[1]
+
+    async with _registry_lock:
+        # Re-check inside lock so concurrent callers share one reload.
+        snapshot = _registry_snapshot
+        if snapshot is not None and time.monotonic() - snapshot[0] <= ttl:
+            return snapshot[1]
+
+        version = _registry_version
+        rows = (await run_query(get_supabase().table("extensions").select("*"))).data or []
+        by_name = {row["name"]: row for row in rows}
+        # a write that landed while we were reading wins; don't overwrite it
+        if version == _registry_version:
+            _registry_snapshot = (time.monotonic(), by_name)
+            _registry_version += 1
+        return by_name
+
+
+def _registry_write(removed: str | None = None, row: dict | None = None) -> None:
+    # write-through: patch the snapshot instead of forcing a full reload
+    global _registry_snapshot, _registry_version
+    if _registry_snapshot is not None:
+        loaded_at, by_name = _registry_snapshot
+        by_name = dict(by_name)
+        if removed is not None:
+            by_name.pop(removed, None)
+        if row:
+            by_name[row["name"]] = row
+        _registry_snapshot = (loaded_at, by_name)
+    _registry_version += 1
+
+
+@traced("extensions.list_extensions")
+async def list_extensions() -> list[dict]:
+    exts = [dict(row) for row in (await _registry()).values()]
     if not exts:
         return []
 
-    # fetch the latest action-log timestamp per extension (one round-trip)
-    logs = (
-        db.table("action_logs")
-        .select("extension_name, created_at")
-        .order("created_at", desc=True)
-        .limit(500)
-        .execute()
-        .data or []
-    )
-    last_used: dict[str, str] = {}
-    for row in logs:
-        name = row["extension_name"]
-        if name not in last_used:
-            last_used[name] = row["created_at"]
+    # per-extension usage summary, maintained by a trigger on action_logs
+    # (009_extension_usage.sql) — one row per extension, no log scan
+    usage_rows = (
+        await run_query(
+            get_supabase()
+            .table("extension_usage")
+            .select("extension_name, last_used_at, call_count, success_count, error_count")
+            .in_("extension_name", [e["name"] for e in exts])
+        )
+    ).data or []
+    usage = {row["extension_name"]: row for row in usage_rows}
 
-    # attach last_used_at, then sort: most-recently-used first, never-used after (by name)
+    # attach usage, then sort: most-recently-used first, never-used after (by name)
     for ext in exts:
-        ext["last_used_at"] = last_used.get(ext["name"])
+        row = usage.get(ext["name"]) or {}
+        ext["last_used_at"] = row.get("last_used_at")
+        ext["call_count"] = row.get("call_count", 0)
+        ext["success_count"] = row.get("success_count", 0)
+        ext["error_count"] = row.get("error_count", 0)
+        ext["health"] = circuit_state(ext["url"])
+        ext["latency_budgets"] = latency_budgets(ext)
 
     def _sort_key(e: dict):
         ts = e.get("last_used_at")
@@ -55,19 +125,41 @@ def list_extensions() -> list[dict]:
     return exts
 
 
-def get_extension(name: str) -> dict | None:
-    result = (
-        get_supabase()
-        .table("extensions")
-        .select("*")
-        .eq("name", name)
-        .single()
-        .execute()
+@traced("extensions.get_extension")
+async def get_extension(name: str) -> dict | None:
+    row = (await _registry()).get(name)
+    return dict(row) if row else None
+
+
+# (registry version, digest, rows) for the last online_extensions() answer
+_online_memo: tuple[int, str, list[dict]] | None = None
+
+
+async def online_extensions() -> tuple[list[dict], str]:
+    """Extensions with visibility "online", by name, plus a sha256 of their rows.
+
+    No usage join — this is what the mcp catalog renders. The digest only
+    changes when row content does, not on every ttl reload of the snapshot.
+    """
+    global _online_memo
+    by_name = await _registry()
+    snapshot, version = _registry_snapshot, _registry_version
+    if snapshot is not None:
+        by_name = snapshot[1]
+        memo = _online_memo
+        if memo is not None and memo[0] == version:
+            return memo[2], memo[1]
+    rows = sorted(
+        (dict(row) for row in by_name.values() if (row.get("visibility") or "online") == "online"),
+        key=lambda row: row["name"],
     )
-    return result.data if result.data else None
+    digest = hashlib.sha256(json.dumps(rows, sort_keys=True, default=str).encode()).hexdigest()
+    if snapshot is not None:
+        _online_memo = (version, digest, rows)
+    return rows, digest
 
 
-def register_extension(
+async def register_extension(
     name: str,
     url: str,
     description: str = "",
@@ -81,7 +173,7 @@ def register_extension(
     db = get_supabase()
     # supabase-py doesn't support chaining .select() after .upsert(), so we
     # do the write then fetch the row in a second call
-    db.table("extensions").upsert(
+    await run_query(db.table("extensions").upsert(
         {
             "name": name,
             "url": url,
@@ -93,30 +185,46 @@ def register_extension(
             "homepage_url": homepage_url,
         },
         on_conflict="name",
-    ).execute()
-    result = db.table("extensions").select("*").eq("name", name).single().execute()
+    ))
+    result = await run_query(db.table("extensions").select("*").eq("name", name).single())
+    _registry_write(row=result.data)
     return result.data
 
 
-def update_extension(name: str, updates: dict) -> dict:
-    allowed = {k: v for k, v in updates.items() if k in ("name", "url", "description", "icon_url", "supabase_url", "vercel_url", "visibility")}
+async def update_extension(name: str, updates: dict) -> dict:
+    allowed = {k: v for k, v in updates.items() if k in ("name", "url", "description", "icon_url", "supabase_url", "vercel_url", "visibility", "min_timeout_seconds", "max_timeout_seconds")}
     if "url" in allowed:
         allowed["url"] = allowed["url"].rstrip("/")
     allowed["updated_at"] = datetime.now(timezone.utc).isoformat()
     db = get_supabase()
-    db.table("extensions").update(allowed).eq("name", name).execute()
+    await run_query(db.table("extensions").update(allowed).eq("name", name))
     new_name = allowed.get("name", name)
-    result = db.table("extensions").select("*").eq("name", new_name).single().execute()
+    result = await run_query(db.table("extensions").select("*").eq("name", new_name).single())
+    _registry_write(removed=name, row=result.data)
     return result.data
 
 
-def delete_extension(name: str) -> None:
-    get_supabase().table("extensions").delete().eq("name", name).execute()
+async def delete_extension(name: str) -> None:
+    await run_query(get_supabase().table("extensions").delete().eq("name", name))
+    _registry_write(removed=name)
 
 
 # ── action logs ────────────────────────────────────────────────────────────────────────
 
-def log_action(
+async def _insert_action_logs(rows: list[dict]) -> None:
+    await run_query(get_supabase().table("action_logs").insert(rows))
+
+
+action_log_writer = ActionLogWriter(
+    _insert_action_logs,
+    max_queue=_settings.action_log_queue_size,
+    batch_size=_settings.action_log_batch_size,
+    flush_interval=_settings.action_log_flush_interval_seconds,
+)
+
+
+@traced("extensions.log_action")
+async def log_action(
     extension_name: str,
     action: str,
     params: dict,
@@ -125,62 +233,215 @@ def log_action(
     result_summary: str | None = None,
     prompt: str | None = None,
     source: str = "mcp",
+    cache_hit: bool = False,
+    duration_ms: int | None = None,
+    request_bytes: int | None = None,
+    response_bytes: int | None = None,
 ) -> None:
-    """Fire-and-forget: write one action_log row. Never raises."""
+    """Fire-and-forget: queue one action_log row for the background writer
+    (or write it inline when batching is off). Never raises."""
+    row = {
+        "extension_name": extension_name,
+        "action": action,
+        "params": params,
+        "success": success,
+        "error": error,
+        "result_summary": result_summary,
+        "prompt": prompt,
+        "source": source,
+        "cache_hit": cache_hit,
+        "duration_ms": duration_ms,
+        "request_bytes": request_bytes,
+        "response_bytes": response_bytes,
+        "trace_id": current_trace_id(),
+        # stamped here, not by the db default, so batched rows keep call order
+        "created_at": datetime.now(timezone.utc).isoformat(),
+    }
+    if _settings.action_log_batching:
+        await action_log_writer.submit(row)
+        return
     try:
-        get_supabase().table("action_logs").insert({
-            "extension_name": extension_name,
-            "action": action,
-            "params": params,
-            "success": success,
-            "error": error,
-            "result_summary": result_summary,
-            "prompt": prompt,
-            "source": source,
-        }).execute()
+        await _insert_action_logs([row])
     except Exception as exc:
         print(f"[log_action] FAILED to write audit log: {exc}", file=sys.stderr)
 
 
-def get_action_logs(extension_name: str, limit: int = 20, offset: int = 0) -> dict:
-    q = (
-        get_supabase()
-        .table("action_logs")
-        .select("*", count="exact")
-        .eq("extension_name", extension_name)
-        .order("created_at", desc=True)
-        .limit(limit)
-        .range(offset, offset + limit - 1)
+def _encode_log_cursor(row: dict) -> str:
+    raw = f"{row['created_at']}|{row['id']}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_log_cursor(cursor: str) -> tuple[str, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, row_id = raw.split("|", 1)
+        datetime.fromisoformat(created_at.replace("Z", "+00:00"))
+        uuid.UUID(row_id)
+    except Exception as exc:
+        raise ValueError("Invalid cursor") from exc
+    return created_at, row_id
+
+
+async def _page_action_logs(
+    filters: dict,
+    limit: int,
+    offset: int,
+    cursor: str | None,
+    include_total: bool,
+) -> dict:
+    # two paging modes over (created_at desc, id desc):
+    #   offset — range() + optional inline count; cost grows with depth
+    #   cursor — keyset seek past the last (created_at, id) seen, so every page
+    #            is an index range scan on action_logs_ext_time / action_logs_time_id
+    def base(query):
+        for col, value in filters.items():
+            query = query.eq(col, value)
+        return query
+
+    table = get_supabase().table("action_logs")
+    inline_count = include_total and cursor is None
+    q = base(table.select("*", count="exact" if inline_count else None))
+    q = q.order("created_at", desc=True).order("id", desc=True)
+
+    count_q = None
+    if cursor is None:
+        # one extra row tells us whether there is a next page
+        q = q.range(offset, offset + limit)
+    else:
+        created_at, row_id = _decode_log_cursor(cursor)
+        # created_at <= c AND (created_at < c OR id < i): the first term is the
+        # index range bound, the second only trims ties on the boundary instant
+        q = (
+            q.lte("created_at", created_at)
+            .or_(f'created_at.lt."{created_at}",id.lt.{row_id}')
+            .limit(limit + 1)
+        )
+        if include_total:
+            count_q = base(get_supabase().table("action_logs").select("id", count="exact", head=True))
+
+    if count_q is not None:
+        result, counted = await asyncio.gather(run_query(q), run_query(count_q))
+        total = counted.count or 0
+    else:
+        result = await run_query(q)
+        total = (result.count or 0) if include_total else None
+
+    rows = result.data or []
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return {
+        "data": rows,
+        "total": total,
+        "next_cursor": _encode_log_cursor(rows[-1]) if has_more and rows else None,
+    }
+
+
+async def get_action_logs(
+    extension_name: str,
+    limit: int = 20,
+    offset: int = 0,
+    cursor: str | None = None,
+    include_total: bool = True,
+) -> dict:
+    return await _page_action_logs(
+        {"extension_name": extension_name}, limit, offset, cursor, include_total,
     )
-    result = q.execute()
-    return {"data": result.data or [], "total": result.count or 0}
 
 
-def get_all_action_logs(
+async def get_all_action_logs(
     limit: int = 20,
     offset: int = 0,
     extension_name: str | None = None,
     source: str | None = None,
     success: bool | None = None,
+    cursor: str | None = None,
+    include_total: bool = True,
 ) -> dict:
-    q = (
-        get_supabase()
-        .table("action_logs")
-        .select("*", count="exact")
-        .order("created_at", desc=True)
-    )
+    filters: dict = {}
     if extension_name:
-        q = q.eq("extension_name", extension_name)
+        filters["extension_name"] = extension_name
     if source:
-        q = q.eq("source", source)
+        filters["source"] = source
     if success is not None:
-        q = q.eq("success", success)
-    q = q.limit(limit).range(offset, offset + limit - 1)
-    result = q.execute()
-    return {"data": result.data or [], "total": result.count or 0}
+        filters["success"] = success
+    return await _page_action_logs(filters, limit, offset, cursor, include_total)
+
+
+_ROLLUP_PAGE_SIZE = 1000  # postgrest's default max-rows
+
+# upper bounds (ms) of action_log_latency_daily buckets; bucket b holds
+# durations in [bounds[b-1], bounds[b]) — must match 015_action_logs_latency.sql
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+
+
+def _bucket_percentile(counts: list[int], pct: float) -> float | None:
+    # linear interpolation inside the bucket holding the pct-th call; the
+    # open-ended last bucket reports its lower bound
+    total = sum(counts)
+    if not total:
+        return None
+    rank = pct / 100 * total
+    seen = 0
+    for bucket, count in enumerate(counts):
+        if count and seen + count >= rank:
+            lower = LATENCY_BUCKETS_MS[bucket - 1] if bucket else 0
+            if bucket >= len(LATENCY_BUCKETS_MS):
+                return float(lower)
+            upper = LATENCY_BUCKETS_MS[bucket]
+            return round(lower + (upper - lower) * (rank - seen) / count, 1)
+        seen += count
+    return float(LATENCY_BUCKETS_MS[-1])
+
+
+def _latency_stats(counts: list[int], duration_sum_ms: int, duration_count: int) -> dict:
+    return {
+        "calls": sum(counts),
+        "avg_ms": round(duration_sum_ms / duration_count, 1) if duration_count else None,
+        "p50_ms": _bucket_percentile(counts, 50),
+        "p95_ms": _bucket_percentile(counts, 95),
+        "p99_ms": _bucket_percentile(counts, 99),
+    }
+
 
+# primary key of action_log_daily (010). pages are ordered by the whole key:
+# ordering by day alone leaves ties, which postgrest may return in a different
+# order on each page, so rows would repeat or go missing between pages
+_DAILY_KEY = ("day", "extension_name", "action", "source", "success")
+_LATENCY_KEY = ("day", "extension_name", "action", "source", "bucket")  # 015
 
-def get_action_log_analytics(
+
+async def _rollup_rows(
+    table: str,
+    columns: str,
+    key: tuple[str, ...],
+    since_day: str,
+    extension_name: str | None,
+    source: str | None,
+) -> list[dict]:
+    rows: list[dict] = []
+    while True:
+        q = get_supabase().table(table).select(columns).gte("day", since_day)
+        for column in key:
+            q = q.order(column, desc=False)
+        if extension_name:
+            q = q.eq("extension_name", extension_name)
+        if source:
+            q = q.eq("source", source)
+        page = (await run_query(q.range(len(rows), len(rows) + _ROLLUP_PAGE_SIZE - 1))).data or []
+        rows.extend(page)
+        if len(page) < _ROLLUP_PAGE_SIZE:
+            return rows
+
+
+async def rebuild_action_log_rollups(since: str | None = None) -> int:
+    """Recompute action_log_daily and action_log_latency_daily from raw
+    action_logs (all days, or from `since` = YYYY-MM-DD). Returns the number
+    of daily buckets written."""
+    result = await run_query(get_supabase().rpc("rebuild_action_log_daily", {"since": since}))
+    return int(result.data or 0)
+
+
+async def get_action_log_analytics(
     days: int = 30,
     extension_name: str | None = None,
     source: str | None = None,
@@ -189,25 +450,31 @@ def get_action_log_analytics(
     since_dt = datetime.now(timezone.utc) - timedelta(days=lookback_days - 1)
     since_iso = since_dt.replace(hour=0, minute=0, second=0, microsecond=0).isoformat()
 
-    q = (
-        get_supabase()
-        .table("action_logs")
-        .select("extension_name, action, source, success, created_at", count="exact")
-        .gte("created_at", since_iso)
-        .order("created_at", desc=False)
-        .limit(5000)
+    # answered from daily rollup buckets (010_action_log_daily.sql): exact
+    # counts, and the row count scales with days × distinct actions, not traffic.
+    # latency percentiles come from the per-bucket counts (015)
+    rows, latency_rows = await asyncio.gather(
+        _rollup_rows(
+            "action_log_daily",
+            "day, extension_name, action, source, success, count, "
+            "duration_count, duration_sum_ms, request_bytes_sum, response_bytes_sum, "
+            "request_bytes_count, response_bytes_count",
+            _DAILY_KEY, since_dt.date().isoformat(), extension_name, source,
+        ),
+        _rollup_rows(
+            "action_log_latency_daily",
+            "extension_name, action, bucket, count",
+            _LATENCY_KEY, since_dt.date().isoformat(), extension_name, source,
+        ),
     )
-    if extension_name:
-        q = q.eq("extension_name", extension_name)
-    if source:
-        q = q.eq("source", source)
-
-    result = q.execute()
-    rows = result.data or []
-    total_matching = result.count or 0
 
     success_count = 0
     error_count = 0
+    n_buckets = len(LATENCY_BUCKETS_MS) + 1
+    # (extension, action) → [duration_count, duration_sum_ms, request_bytes_sum,
+    #                        response_bytes_sum, request_bytes_count, response_bytes_count]
+    action_sums: dict[tuple[str, str], list[int]] = {}
+    action_buckets: dict[tuple[str, str], list[int]] = {}
     source_counter: Counter[str] = Counter()
     action_counter: Counter[str] = Counter()
     extension_counter: Counter[str] = Counter()
@@ -220,39 +487,73 @@ def get_action_log_analytics(
         current_day += timedelta(days=1)
 
     for row in rows:
+        count = int(row.get("count") or 0)
         success = bool(row.get("success"))
         if success:
-            success_count += 1
+            success_count += count
         else:
-            error_count += 1
+            error_count += count
 
         src = str(row.get("source") or "unknown")
-        source_counter[src] += 1
+        source_counter[src] += count
 
         action = str(row.get("action") or "unknown")
-        action_counter[action] += 1
+        action_counter[action] += count
 
         ext = str(row.get("extension_name") or "unknown")
-        extension_counter[ext] += 1
+        extension_counter[ext] += count
 
-        created_at = str(row.get("created_at") or "")
-        day_key = created_at[:10] if len(created_at) >= 10 else ""
+        sums = action_sums.setdefault((ext, action), [0] * 6)
+        sums[0] += int(row.get("duration_count") or 0)
+        sums[1] += int(row.get("duration_sum_ms") or 0)
+        sums[2] += int(row.get("request_bytes_sum") or 0)
+        sums[3] += int(row.get("response_bytes_sum") or 0)
+        sums[4] += int(row.get("request_bytes_count") or 0)
+        sums[5] += int(row.get("response_bytes_count") or 0)
+
+        day_key = str(row.get("day") or "")[:10]
         if day_key in daily_map:
-            daily_map[day_key]["total"] += 1
+            daily_map[day_key]["total"] += count
             if success:
-                daily_map[day_key]["success"] += 1
+                daily_map[day_key]["success"] += count
             else:
-                daily_map[day_key]["error"] += 1
+                daily_map[day_key]["error"] += count
+
+    for row in latency_rows:
+        key = (str(row.get("extension_name") or "unknown"), str(row.get("action") or "unknown"))
+        bucket = min(max(int(row.get("bucket") or 0), 0), n_buckets - 1)
+        action_buckets.setdefault(key, [0] * n_buckets)[bucket] += int(row.get("count") or 0)
+
+    latency_by_action = []
+    by_extension: dict[str, list] = {}
+    overall = [[0] * n_buckets, 0, 0]
+    for (ext, action), counts in action_buckets.items():
+        duration_count, duration_sum, request_sum, response_sum, request_count, response_count = (
+            action_sums.get((ext, action), [0] * 6)
+        )
+        latency_by_action.append({
+            "extension": ext,
+            "action": action,
+            **_latency_stats(counts, duration_sum, duration_count),
+            # averaged over the rows that logged a size, not over timed calls
+            "avg_request_bytes": round(request_sum / request_count) if request_count else None,
+            "avg_response_bytes": round(response_sum / response_count) if response_count else None,
+        })
+        for agg in (by_extension.setdefault(ext, [[0] * n_buckets, 0, 0]), overall):
+            agg[0] = [a + b for a, b in zip(agg[0], counts)]
+            agg[1] += duration_sum
+            agg[2] += duration_count
+    latency_by_action.sort(key=lambda r: (-r["calls"], r["extension"], r["action"]))
 
-    total_events = len(rows)
+    total_events = success_count + error_count
     success_rate = round((success_count / total_events) * 100, 1) if total_events else 0.0
 
     return {
         "window_days": lookback_days,
         "since": since_iso,
-        "sampled": total_matching > len(rows),
-        "sample_size": len(rows),
-        "total_matching": total_matching,
+        "sampled": False,
+        "sample_size": total_events,
+        "total_matching": total_events,
         "totals": {
             "events": total_events,
             "success": success_count,
@@ -274,23 +575,63 @@ def get_action_log_analytics(
             for name, count in extension_counter.most_common(10)
         ],
         "daily": list(daily_map.values()),
+        # only calls logged with duration_ms (015 onwards) are counted here
+        "latency": {
+            "overall": _latency_stats(*overall),
+            "by_extension": [
+                {"extension": ext, **_latency_stats(*agg)}
+                for ext, agg in sorted(by_extension.items())
+            ],
+            "by_action": latency_by_action,
+            "slowest_actions": sorted(
+                latency_by_action,
+                key=lambda r: (-(r["p95_ms"] or 0), -(r["p99_ms"] or 0), -r["calls"]),
+            )[:10],
+        },
     }
 
 
 # ── protocol proxy ─────────────────────────────────────────────────────────────
 
 _http_client: httpx.AsyncClient | None = None
-_capabilities_cache: dict[str, tuple[float, list[dict]]] = {}
-_capabilities_fetch_locks: dict[str, asyncio.Lock] = {}
-_CAPABILITIES_CACHE_TTL_SECONDS = 23 * 60 * 60
+# capabilities are cached in two tiers: this dict, and the capabilities_cache
+# table (012) so cold starts begin warm. entries are (fetched_at epoch, caps).
+# past the ttl an entry is still served while one background refresh runs;
+# past capabilities_max_stale_seconds callers wait for the upstream fetch.
+# the memory tier is a bounded lru (entries + bytes) because urls arrive from
+# the unauthenticated register preview; fetch locks only live while in use.
+_capabilities_cache = BoundedCache(
+    max_entries=_settings.capabilities_cache_max_entries,
+    max_bytes=_settings.capabilities_cache_max_bytes,
+)
+_capabilities_fetch_locks: dict[str, tuple[asyncio.Lock, list[int]]] = {}
+_background_tasks: set[asyncio.Task] = set()
+# bumped whenever a url's cached capabilities change content (or are
+# dropped), so renderers of the capabilities can tell when to rebuild
+_capabilities_version = 0
+
+
+def capabilities_version() -> int:
+    return _capabilities_version
+
+
+def peek_capabilities(url: str) -> tuple[float, list[dict]] | None:
+    """The in-memory (fetched_at, capabilities) for url, without fetching."""
+    return _capabilities_cache.peek(_normalized_extension_url(url))
+
+
+async def _propagate_trace(request: httpx.Request) -> None:
+    # runs in the caller's task, so the current span is the upstream span
+    request.headers.update(trace_headers())
 
 
 def get_http_client() -> httpx.AsyncClient:
     global _http_client
     if _http_client is None:
         _http_client = httpx.AsyncClient(
-            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            limits=httpx.Limits(max_connections=_settings.upstream_max_in_flight, max_keepalive_connections=20),
             follow_redirects=True,
+            event_hooks={"request": [_propagate_trace]},
         )
     return _http_client
 
@@ -306,73 +647,847 @@ def _normalized_extension_url(url: str) -> str:
     return url.rstrip("/")
 
 
+def _spawn(coro) -> None:
+    # keep a reference so fire-and-forget tasks aren't garbage-collected mid-run
+    task = asyncio.get_running_loop().create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
 def invalidate_capabilities_cache(url: str | None = None) -> None:
+    global _capabilities_version
+    _capabilities_version += 1
     if url is None:
         _capabilities_cache.clear()
+        _validators.clear()
         return
-    _capabilities_cache.pop(_normalized_extension_url(url), None)
+    normalized_url = _normalized_extension_url(url)
+    _capabilities_cache.pop(normalized_url, None)
+    _validators.pop(normalized_url, None)
+    try:
+        _spawn(_delete_persisted_capabilities(normalized_url))
+    except RuntimeError:
+        pass  # no running loop; the persisted copy ages out on its own
+
+
+@asynccontextmanager
+async def _capabilities_lock(url: str):
+    # per-url lock, reference-counted so it is dropped once nobody holds or
+    # waits on it — keeps the dict as small as the set of in-flight fetches
+    entry = _capabilities_fetch_locks.get(url)
+    if entry is None:
+        entry = (asyncio.Lock(), [0])
+        _capabilities_fetch_locks[url] = entry
+    lock, users = entry
+    users[0] += 1
+    try:
+        async with lock:
+            yield
+    finally:
+        users[0] -= 1
+        if users[0] == 0 and _capabilities_fetch_locks.get(url) is entry:
+            del _capabilities_fetch_locks[url]
+
+
+def capabilities_cache_stats() -> dict:
+    return {**_capabilities_cache.stats(), "fetches_in_flight": len(_capabilities_fetch_locks)}
+
+
+async def _load_persisted_capabilities(url: str) -> tuple[float, list[dict]] | None:
+    try:
+        rows = (
+            await run_query(
+                get_supabase()
+                .table("capabilities_cache")
+                .select("capabilities, fetched_at")
+                .eq("url", url)
+                .limit(1)
+            )
+        ).data or []
+    except Exception as exc:
+        print(f"[capabilities] persisted cache read failed for {url}: {exc}", file=sys.stderr)
+        return None
+    if not rows or not isinstance(rows[0].get("capabilities"), list):
+        return None
+    fetched_at = datetime.fromisoformat(str(rows[0]["fetched_at"]).replace("Z", "+00:00")).timestamp()
+    return fetched_at, rows[0]["capabilities"]
+
+
+async def _persist_capabilities(url: str, fetched_at: float, capabilities: list[dict]) -> None:
+    try:
+        await run_query(get_supabase().table("capabilities_cache").upsert(
+            {
+                "url": url,
+                "capabilities": capabilities,
+                "fetched_at": datetime.fromtimestamp(fetched_at, timezone.utc).isoformat(),
+            },
+            on_conflict="url",
+        ))
+    except Exception as exc:
+        print(f"[capabilities] persisted cache write failed for {url}: {exc}", file=sys.stderr)
+
+
+async def _delete_persisted_capabilities(url: str) -> None:
+    try:
+        await run_query(get_supabase().table("capabilities_cache").delete().eq("url", url))
+    except Exception as exc:
+        print(f"[capabilities] persisted cache delete failed for {url}: {exc}", file=sys.stderr)
+
+
+# ── circuit breakers + admission ───────────────────────────────────────────────
+
+_scheduler = UpstreamScheduler(
+    max_in_flight=_settings.upstream_max_in_flight,
+    per_extension=_settings.upstream_per_extension_limit,
+)
+
+# breakers have their own bound (urls also arrive from the unauthenticated
+# register preview). when full, healthy breakers go first — dropping one loses
+# nothing — then closed ones with a failure count; open and half-open breakers
+# are never dropped. if only those remain, a new url gets an untracked breaker
+_circuits: dict[str, CircuitBreaker] = {}
+
+
+def _make_room_for_circuit() -> bool:
+    limit = _settings.circuit_max_entries
+    if len(_circuits) < limit:
+        return True
+    for droppable in (
+        lambda b: b.state == CLOSED and b.consecutive_failures == 0,
+        lambda b: b.state == CLOSED,
+    ):
+        for key in [k for k, b in _circuits.items() if droppable(b)]:
+            del _circuits[key]
+            if len(_circuits) < limit:
+                return True
+    return False
+
+
+def circuit_for(url: str) -> CircuitBreaker:
+    normalized_url = _normalized_extension_url(url)
+    breaker = _circuits.get(normalized_url)
+    if breaker is None:
+        breaker = CircuitBreaker(
+            normalized_url,
+            failure_threshold=_settings.circuit_failure_threshold,
+            reset_timeout=_settings.circuit_reset_seconds,
+        )
+        if _make_room_for_circuit():
+            _circuits[normalized_url] = breaker
+    return breaker
+
+
+def circuit_state(url: str) -> dict:
+    breaker = _circuits.get(_normalized_extension_url(url))
+    if breaker is None:
+        return {"state": CLOSED, "consecutive_failures": 0, "opened_at": None, "last_error": None}
+    return breaker.snapshot()
+
+
+def is_circuit_open(url: str) -> bool:
+    breaker = _circuits.get(_normalized_extension_url(url))
+    return breaker is not None and breaker.is_open()
+
+
+def scheduler_stats() -> dict:
+    return _scheduler.stats()
+
+
+# ── upstream timeouts ──────────────────────────────────────────────────────────
+
+_latency = LatencyTracker(
+    window=_settings.timeout_window_size,
+    min_samples=_settings.timeout_min_samples,
+    percentile=_settings.timeout_percentile,
+    multiplier=_settings.timeout_multiplier,
+    floor=_settings.timeout_floor_seconds,
+    ceiling=_settings.timeout_ceiling_seconds,
+    max_keys=_settings.timeout_tracker_max_keys,
+    adaptive=_settings.adaptive_timeouts,
+)
+_DEFAULT_TIMEOUTS = {
+    "info": _settings.info_timeout_seconds,
+    "capabilities": _settings.info_timeout_seconds,
+    "execute": _settings.execute_timeout_seconds,
+}
+
+
+def _registry_row_for_url(normalized_url: str) -> dict | None:
+    # read straight from the snapshot, stale or not — this runs on every
+    # upstream call, so it must not trigger a reload
+    snapshot = _registry_snapshot
+    if snapshot is not None:
+        for row in snapshot[1].values():
+            if _normalized_extension_url(row.get("url") or "") == normalized_url:
+                return row
+    return None
+
+
+def _timeout_bounds(normalized_url: str) -> tuple[float | None, float | None]:
+    # per-extension overrides (014) from the registry row
+    row = _registry_row_for_url(normalized_url) or {}
+    return row.get("min_timeout_seconds"), row.get("max_timeout_seconds")
+
+
+def upstream_timeout(url: str, op: str) -> float:
+    normalized_url = _normalized_extension_url(url)
+    floor, ceiling = _timeout_bounds(normalized_url)
+    default = _DEFAULT_TIMEOUTS.get(op) or _DEFAULT_TIMEOUTS[op.split(":", 1)[0]]
+    return _latency.timeout(normalized_url, op, default, floor, ceiling)
+
+
+def latency_budgets(ext: dict) -> dict:
+    """Observed latency and current timeout per operation for a registry row."""
+    return _latency.snapshot(
+        _normalized_extension_url(ext["url"]),
+        _DEFAULT_TIMEOUTS,
+        ext.get("min_timeout_seconds"),
+        ext.get("max_timeout_seconds"),
+    )
+
+
+# ── upstream metrics ───────────────────────────────────────────────────────────
+
+_upstream_seconds = REGISTRY.histogram(
+    "jesseverse_upstream_request_seconds",
+    "Latency of one upstream request (one attempt) to response headers.",
+    ("extension", "operation", "action"),
+)
+_upstream_errors = REGISTRY.counter(
+    "jesseverse_upstream_errors_total",
+    "Upstream attempts that failed: timeout, transport error or 5xx.",
+    ("extension", "operation", "action", "kind"),
+)
+_upstream_in_flight = REGISTRY.gauge(
+    "jesseverse_upstream_in_flight", "Upstream requests currently sent and awaiting headers.", ("extension",),
+)
+_proxy_execute_seconds = REGISTRY.histogram(
+    "jesseverse_proxy_execute_seconds",
+    "End-to-end proxy_execute time: coalescing, queueing, retries and the upstream call.",
+    ("extension", "action"),
+)
+_capabilities_seconds = REGISTRY.histogram(
+    "jesseverse_fetch_capabilities_seconds",
+    "fetch_capabilities time by how it was answered (fresh, stale, persisted, upstream, fallback).",
+    ("result",),
+)
+
+
+def _extension_label(normalized_url: str) -> str:
+    row = _registry_row_for_url(normalized_url)
+    return row["name"] if row else normalized_url
+
+
+def _op_labels(op: str) -> tuple[str, str]:
+    operation, _, action = op.partition(":")
+    return operation, action
+
+
+_cache_entries = REGISTRY.gauge("jesseverse_cache_entries", "Entries held by an in-memory cache.", ("cache",))
+_cache_bytes = REGISTRY.gauge("jesseverse_cache_bytes", "Approximate bytes held by an in-memory cache.", ("cache",))
+_cache_hits = REGISTRY.counter("jesseverse_cache_hits_total", "In-memory cache lookups that found an entry.", ("cache",))
+_cache_misses = REGISTRY.counter("jesseverse_cache_misses_total", "In-memory cache lookups that missed.", ("cache",))
+_cache_evictions = REGISTRY.counter("jesseverse_cache_evictions_total", "Entries evicted by the lru bounds.", ("cache",))
+_lane_queue = REGISTRY.gauge("jesseverse_scheduler_queue_depth", "Upstream requests waiting for a slot.", ("lane",))
+_lane_in_flight = REGISTRY.gauge("jesseverse_scheduler_in_flight", "Upstream slots held.", ("lane",))
+_lane_admitted = REGISTRY.counter("jesseverse_scheduler_admitted_total", "Upstream slots granted.", ("lane",))
+_lane_waited = REGISTRY.counter("jesseverse_scheduler_waited_total", "Slot grants that had to queue.", ("lane",))
+_retries = REGISTRY.counter("jesseverse_upstream_retry_events_total", "Retry and hedging events.", ("event",))
+_log_writer = REGISTRY.gauge("jesseverse_action_log_writer", "Action log writer queue and counters.", ("stat",))
+_jobs = REGISTRY.gauge("jesseverse_jobs", "Async execute jobs held, by status, and job counters.", ("stat",))
+
+
+@REGISTRY.collector
+def _collect_service_metrics() -> None:
+    for cache, stats in (("capabilities", _capabilities_cache.stats()), ("result", _result_cache.stats())):
+        _cache_entries.set(stats["entries"], cache)
+        _cache_bytes.set(stats["bytes"], cache)
+        _cache_hits.set_total(stats["hits"], cache)
+        _cache_misses.set_total(stats["misses"], cache)
+        _cache_evictions.set_total(stats["evictions"], cache)
+    for lane, stats in _scheduler.stats()["lanes"].items():
+        _lane_queue.set(stats["queue_depth"], lane)
+        _lane_in_flight.set(stats["in_flight"], lane)
+        _lane_admitted.set_total(stats["admitted"], lane)
+        _lane_waited.set_total(stats["waited"], lane)
+    for event, value in _retry_stats.snapshot().items():
+        _retries.set_total(value, event)
+    for stat, value in action_log_writer.stats().items():
+        if isinstance(value, (int, float)):
+            _log_writer.set(value, stat)
+    for stat, value in job_runner.stats().items():
+        _jobs.set(value, stat)
+
+
+_RETRYABLE_STATUS = {502, 503, 504}
+# only failures where the extension can't have acted on the request: a read,
+# write or pool timeout may leave it running, and retrying those would stack
+# another full timeout on top of the first
+_RETRYABLE_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.RemoteProtocolError)
+_retry_stats = RetryStats()
+
+
+def retry_stats() -> dict:
+    return _retry_stats.snapshot()
+
+
+async def _send_upstream(
+    url: str,
+    op: str,
+    send: Callable[[float], Awaitable[httpx.Response]],
+    lane: str = INTERACTIVE,
+    *,
+    idempotent: bool = False,
+) -> httpx.Response:
+    """Send one upstream request; idempotent ones get retries and hedging.
+
+    The extension's breaker sees each logical call once: an open circuit
+    raises CircuitOpenError here without touching the network, and the
+    outcome is recorded after any retries, so one failing call can't open
+    the circuit on its own. Transport errors and 502/503/504 are retried up
+    to upstream_retries times with jittered backoff. With upstream_hedging,
+    each attempt is hedged after the op's hedge_percentile latency.
+    """
+    breaker = circuit_for(url)
+    breaker.acquire()
+    try:
+        if idempotent:
+            resp = await _send_with_retries(url, op, send, lane)
+        else:
+            resp = await _send_once(url, op, send, lane)
+    except httpx.TransportError as exc:
+        breaker.record_failure(str(exc) or type(exc).__name__)
+        raise
+    except BaseException:
+        breaker.release()
+        raise
+    if resp.status_code >= 500:
+        breaker.record_failure(f"HTTP {resp.status_code}")
+    else:
+        breaker.record_success()
+    return resp
+
 
+async def _send_with_retries(
+    url: str,
+    op: str,
+    send: Callable[[float], Awaitable[httpx.Response]],
+    lane: str,
+) -> httpx.Response:
+    retries = _settings.upstream_retries
+    for attempt in range(retries + 1):
+        last = attempt == retries
+        try:
+            resp = await hedged(
+                lambda: _send_once(url, op, send, lane),
+                _hedge_delay(url, op),
+                _retry_stats,
+            )
+        except _RETRYABLE_ERRORS:
+            if last:
+                if retries:
+                    _retry_stats.retries_exhausted += 1
+                raise
+        else:
+            if resp.status_code not in _RETRYABLE_STATUS:
+                if attempt:
+                    _retry_stats.retry_successes += 1
+                return resp
+            if last:
+                if retries:
+                    _retry_stats.retries_exhausted += 1
+                return resp
+            await resp.aclose()
+        _retry_stats.retries += 1
+        await asyncio.sleep(backoff_delay(
+            attempt, _settings.retry_backoff_base_seconds, _settings.retry_backoff_max_seconds,
+        ))
+    raise AssertionError("unreachable")
+
+
+def _hedge_delay(url: str, op: str) -> float | None:
+    if not _settings.upstream_hedging:
+        return None
+    p = _latency.quantile(_normalized_extension_url(url), op, _settings.hedge_percentile)
+    return None if p is None else max(p, _settings.hedge_min_delay_seconds)
+
+
+async def _send_once(
+    url: str,
+    op: str,
+    send: Callable[[float], Awaitable[httpx.Response]],
+    lane: str,
+) -> httpx.Response:
+    # one attempt (the breaker is handled per call by _send_upstream): wait
+    # for a scheduler slot in the lane; the slot covers the request until
+    # response headers (streamed bodies are read after release). send() gets
+    # the adaptive timeout for (url, op); its latency to headers feeds back
+    # into the same window
+    extension = _extension_label(url)
+    operation, action = _op_labels(op)
+    try:
+        with span("upstream", extension=extension, operation=operation, action=action, lane=lane) as up:
+            queued = time.monotonic()
+            async with _scheduler.slot(url, lane):
+                _upstream_in_flight.inc(extension)
+                started = time.monotonic()
+                timeout = upstream_timeout(url, op)
+                if up is not None:
+                    up.set(queued_ms=round((started - queued) * 1000, 3), timeout_seconds=timeout)
+                try:
+                    resp = await send(timeout)
+                except httpx.TimeoutException:
+                    _latency.record(url, op, time.monotonic() - started)
+                    _upstream_errors.inc(extension, operation, action, "timeout")
+                    raise
+                finally:
+                    elapsed = time.monotonic() - started
+                    _upstream_in_flight.dec(extension)
+                    _upstream_seconds.observe(elapsed, extension, operation, action)
+                if up is not None:
+                    up.set(status_code=resp.status_code)
+                    if resp.status_code >= 500:
+                        up.fail(f"HTTP {resp.status_code}")
+                if resp.status_code < 500:
+                    _latency.record(url, op, elapsed)
+    except httpx.TransportError as exc:
+        if not isinstance(exc, httpx.TimeoutException):
+            _upstream_errors.inc(extension, operation, action, "transport")
+        raise
+    if resp.status_code >= 500:
+        _upstream_errors.inc(extension, operation, action, "http_5xx")
+    return resp
 
-def _capabilities_lock_for(url: str) -> asyncio.Lock:
-    lock = _capabilities_fetch_locks.get(url)
-    if lock is None:
-        lock = asyncio.Lock()
-        _capabilities_fetch_locks[url] = lock
-    return lock
 
 async def fetch_info(url: str) -> dict:
     normalized_url = _normalized_extension_url(url)
     client = get_http_client()
-    resp = await client.get(f"{normalized_url}/info", timeout=10)
+    resp = await _send_upstream(
+        normalized_url, "info", lambda timeout: client.get(f"{normalized_url}/info", timeout=timeout),
+        idempotent=True,
+    )
     resp.raise_for_status()
     return resp.json()
 
 
+async def _fetch_capabilities_upstream(url: str, persist: bool, lane: str = INTERACTIVE) -> list[dict]:
+    global _capabilities_version
+    client = get_http_client()
+    resp = await _send_upstream(
+        url, "capabilities", lambda timeout: client.get(f"{url}/capabilities", timeout=timeout), lane,
+        idempotent=True,
+    )
+    resp.raise_for_status()
+    capabilities = resp.json()
+    if not isinstance(capabilities, list):
+        raise RuntimeError("Extension did not return a capabilities array")
+
+    fetched_at = time.time()
+    previous = _capabilities_cache.peek(url)
+    _capabilities_cache.set(url, (fetched_at, capabilities), size=len(resp.content))
+    # a new entry only counts for registered urls (persist); unauthenticated
+    # preview fetches would otherwise invalidate the mcp catalog at will
+    changed = persist if previous is None else previous[1] != capabilities
+    if changed:
+        _capabilities_version += 1
+    if persist:
+        # awaited, not spawned: a serverless host may freeze once the response
+        # is sent, and the write must land before then (failures only log)
+        await _persist_capabilities(url, fetched_at, capabilities)
+    return capabilities
+
+
+async def _refresh_capabilities_in_background(url: str, persist: bool) -> None:
+    if url in _capabilities_fetch_locks:
+        return  # a refresh (or foreground fetch) is already in flight
+    async with _capabilities_lock(url):
+        try:
+            await _fetch_capabilities_upstream(url, persist, BACKGROUND)
+        except Exception as exc:
+            # keep serving the last good copy
+            print(f"[capabilities] background refresh failed for {url}: {exc}", file=sys.stderr)
+
+
 async def fetch_capabilities(
     url: str,
     *,
     use_cache: bool = True,
-    max_age_seconds: int = _CAPABILITIES_CACHE_TTL_SECONDS,
+    max_age_seconds: int | None = None,
+    persist: bool = True,
+    lane: str = INTERACTIVE,
 ) -> list[dict]:
-    normalized_url = _normalized_extension_url(url)
-    now = time.monotonic()
+    """Return an extension's /capabilities array.
+
+    With use_cache, a fresh entry is returned as-is and a stale one is returned
+    immediately while a background refresh runs. Only a missing or very old
+    entry makes the caller wait on the upstream fetch, and if that fails the
+    last good copy is returned instead of the error. persist=False keeps the
+    result out of the database tier (used for unregistered preview urls).
+    lane is the scheduler lane for a foreground fetch; background refreshes
+    always use the background lane.
+
+    The background refresh is best-effort: on a host that freezes after the
+    response it may never finish. Nothing depends on it — once the entry is
+    older than capabilities_max_stale_seconds the next caller refetches inline.
+    """
+    started = time.perf_counter()
+    result = "error"
+    with span("extensions.fetch_capabilities") as current:
+        try:
+            capabilities, result = await _fetch_capabilities(
+                _normalized_extension_url(url), use_cache, max_age_seconds, persist, lane,
+            )
+            return capabilities
+        finally:
+            _capabilities_seconds.observe(time.perf_counter() - started, result)
+            if current is not None:
+                current.set(result=result)
+
 
-    if use_cache:
-        cached = _capabilities_cache.get(normalized_url)
+async def _fetch_capabilities(
+    normalized_url: str,
+    use_cache: bool,
+    max_age_seconds: int | None,
+    persist: bool,
+    lane: str,
+) -> tuple[list[dict], str]:
+    # returns (capabilities, how they were answered) for the metrics label
+    settings = get_settings()
+    ttl = settings.capabilities_cache_ttl_seconds if max_age_seconds is None else max_age_seconds
+
+    if not use_cache:
+        async with _capabilities_lock(normalized_url):
+            return await _fetch_capabilities_upstream(normalized_url, persist, lane), "upstream"
+
+    cached = _capabilities_cache.get(normalized_url)
+    source = "fresh"
+    if cached is None and persist:
+        cached = await _load_persisted_capabilities(normalized_url)
+        source = "persisted"
         if cached is not None:
-            cached_at, cached_data = cached
-            if now - cached_at <= max_age_seconds:
-                return cached_data
+            _capabilities_cache.setdefault(normalized_url, cached)
+
+    if cached is not None:
+        cached_at, cached_data = cached
+        age = time.time() - cached_at
+        if age <= ttl:
+            return cached_data, source
+        if age <= settings.capabilities_max_stale_seconds:
+            _spawn(_refresh_capabilities_in_background(normalized_url, persist))
+            return cached_data, "stale"
 
-    lock = _capabilities_lock_for(normalized_url)
-    async with lock:
+    async with _capabilities_lock(normalized_url):
         # Re-check after waiting on the lock to avoid duplicate upstream calls.
-        if use_cache:
-            cached = _capabilities_cache.get(normalized_url)
-            if cached is not None:
-                cached_at, cached_data = cached
-                if time.monotonic() - cached_at <= max_age_seconds:
-                    return cached_data
+        fresher = _capabilities_cache.peek(normalized_url)
+        if fresher is not None and fresher is not cached:
+            return fresher[1], "fresh"
+        try:
+            return await _fetch_capabilities_upstream(normalized_url, persist, lane), "upstream"
+        except Exception:
+            if cached is None:
+                raise
+            print(f"[capabilities] fetch failed for {normalized_url}; serving last good copy", file=sys.stderr)
+            return cached[1], "fallback"
+
+
+async def open_execute_stream(url: str, action: str, parameters: dict) -> httpx.Response:
+    """POST /execute and return the response with its body still unread.
+
+    Used by the streaming execute route to relay large results without
+    buffering them. The caller must aclose() the response. Non-2xx responses
+    are read, closed and raised as RuntimeError like proxy_execute does.
+    """
+    normalized_url = _normalized_extension_url(url)
+    client = get_http_client()
+
+    def send(timeout: float) -> Awaitable[httpx.Response]:
+        request = client.build_request(
+            "POST",
+            f"{normalized_url}/execute",
+            json={"action": action, "parameters": parameters},
+            timeout=timeout,
+        )
+        return client.send(request, stream=True)
+
+    resp = await _send_upstream(normalized_url, f"execute:{action}", send)
+    if not resp.is_success:
+        try:
+            await resp.aread()
+        finally:
+            await resp.aclose()
+        try:
+            body = resp.json()
+            detail = body.get("error") or body.get("detail") or json.dumps(body)
+        except Exception:
+            detail = resp.text or f"HTTP {resp.status_code}"
+        raise RuntimeError(f"HTTP {resp.status_code} from extension:\n{detail}")
+    return resp
+
+
+_SUCCESS_RE = re.compile(rb'"success"\s*:\s*(true|false)')
+_ERROR_RE = re.compile(rb'"error"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+
+def inspect_execute_prefix(prefix: bytes, complete: bool) -> tuple[bool, str | None, str | None]:
+    """Best-effort (success, error, result_summary) from the first bytes of a
+    streamed /execute body. complete=True means prefix is the whole body."""
+    if complete:
+        try:
+            body = json.loads(prefix)
+            return bool(body.get("success", True)), body.get("error"), summarize(body.get("data"))
+        except Exception:
+            pass
+    match = _SUCCESS_RE.search(prefix)
+    success = match is None or match.group(1) == b"true"
+    error = None
+    if not success:
+        err = _ERROR_RE.search(prefix)
+        try:
+            error = json.loads(b'"' + err.group(1) + b'"') if err else "unknown error (streamed)"
+        except ValueError:
+            error = err.group(1).decode("utf-8", errors="replace")
+    text = prefix[:SUMMARY_CHARS].decode("utf-8", errors="ignore")
+    return success, error, text + "…"
+
+
+def find_capability(capabilities: list[dict] | None, action: str) -> dict | None:
+    for cap in capabilities or []:
+        if cap.get("name") == action:
+            return cap
+    return None
+
+
+# compiled parameter validators, kept per url next to the capabilities they
+# were compiled from: (capabilities list, {action: validator}). a new
+# capabilities list for the url (refresh, reload) starts a fresh dict.
+_validators = BoundedCache(max_entries=_settings.capabilities_cache_max_entries, max_bytes=sys.maxsize)
+
+
+def validate_parameters(url: str, capabilities: list[dict] | None, action: str, parameters: dict) -> str | None:
+    """Error message if `parameters` break the action's schema, else None.
+
+    Nothing is checked when the capabilities or the action are unknown.
+    """
+    if capabilities is None or not _settings.parameter_validation:
+        return None
+    normalized_url = _normalized_extension_url(url)
+    entry = _validators.peek(normalized_url)
+    if entry is None or entry[0] is not capabilities:
+        entry = (capabilities, {})
+        _validators.set(normalized_url, entry, size=0)
+    validator = entry[1].get(action)
+    if validator is None:
+        capability = find_capability(capabilities, action)
+        if capability is None:
+            return None
+        validator = entry[1][action] = ParameterValidator(capability)
+    problems = validator.errors(parameters)
+    return format_errors(action, problems) if problems else None
+
+
+def is_read_only(capability: dict | None) -> bool:
+    # extensions opt in per action with "read_only": true in /capabilities
+    return bool(capability and capability.get("read_only"))
+
+
+def is_idempotent(capability: dict | None) -> bool:
+    # safe to send more than once: "idempotent": true, or implied by read_only
+    return bool(capability and (capability.get("idempotent") or capability.get("read_only")))
+
+
+def is_cacheable(capability: dict | None) -> bool:
+    # opt-in result caching: "cacheable": true (+ optional "cache_ttl_seconds")
+    return bool(capability and capability.get("cacheable"))
+
+
+def cache_ttl(capability: dict | None) -> float:
+    """The action's cache_ttl_seconds, or the default when missing or not a
+    finite number; negative values are clamped to 0 (no caching)."""
+    raw = (capability or {}).get("cache_ttl_seconds")
+    if raw is None or isinstance(raw, bool):
+        return float(_settings.result_cache_default_ttl_seconds)
+    try:
+        ttl = float(raw)
+    except (TypeError, ValueError):
+        return float(_settings.result_cache_default_ttl_seconds)
+    if math.isnan(ttl) or math.isinf(ttl):
+        return float(_settings.result_cache_default_ttl_seconds)
+    return max(ttl, 0.0)
+
+
+def execute_request_bytes(action: str, parameters: dict) -> int:
+    """Size of the /execute request body the hub sends for this call."""
+    return len(json.dumps({"action": action, "parameters": parameters}, default=str).encode())
+
+
+def elapsed_ms(started: float) -> int:
+    # started is a time.perf_counter() reading
+    return round((time.perf_counter() - started) * 1000)
+
+
+def _execute_key(normalized_url: str, action: str, parameters: dict) -> tuple[str, str, str]:
+    return (
+        normalized_url,
+        action,
+        json.dumps(parameters, sort_keys=True, separators=(",", ":"), default=str),
+    )
+
 
-        client = get_http_client()
-        resp = await client.get(f"{normalized_url}/capabilities", timeout=10)
-        resp.raise_for_status()
-        capabilities = resp.json()
-        if not isinstance(capabilities, list):
-            raise RuntimeError("Extension did not return a capabilities array")
+# in-flight coalesced executes, keyed by _execute_key plus the lane — an
+# interactive caller never waits behind a request queued in the background lane
+_inflight_executes: dict[tuple[str, str, str, str], asyncio.Task] = {}
 
-        _capabilities_cache[normalized_url] = (time.monotonic(), capabilities)
-        return capabilities
+# successful results of cacheable actions:
+#   _execute_key → (expires_at, result, upstream response bytes)
+_result_cache = BoundedCache(
+    max_entries=_settings.result_cache_max_entries,
+    max_bytes=_settings.result_cache_max_bytes,
+)
 
 
-async def proxy_execute(url: str, action: str, parameters: dict) -> dict:
+def invalidate_result_cache(url: str | None = None) -> None:
+    if url is None:
+        _result_cache.clear()
+        return
     normalized_url = _normalized_extension_url(url)
+    for key in _result_cache.keys():
+        if key[0] == normalized_url:
+            _result_cache.pop(key)
+
+
+def note_successful_call(url: str, capability: dict | None) -> None:
+    """Apply the write rule after a successful execute: anything not marked
+    read_only or cacheable may have changed state, so the extension's cached
+    results are dropped. Shared by run_action and the streamed relay."""
+    if not is_cacheable(capability) and not is_read_only(capability):
+        invalidate_result_cache(url)
+
+
+def result_cache_stats() -> dict:
+    return _result_cache.stats()
+
+
+@traced("extensions.run_action")
+async def run_action(
+    url: str,
+    action: str,
+    parameters: dict,
+    capability: dict | None = None,
+) -> tuple[dict, bool, int]:
+    """Execute an action through the hub's result cache and coalescing.
+
+    capability is the action's /capabilities entry (None if unknown). Returns
+    (result, cache_hit, response_bytes), where response_bytes is the size of
+    the upstream /execute body (the original one for a cache hit). Successful
+    calls go through note_successful_call.
+    """
+    normalized_url = _normalized_extension_url(url)
+    # the ttl is parsed up front so a bad one can never fail a finished call
+    ttl = cache_ttl(capability)
+    cacheable = is_cacheable(capability)
+
+    if cacheable:
+        key = _execute_key(normalized_url, action, parameters)
+        cached = _result_cache.get(key)
+        if cached is not None:
+            expires_at, cached_result, cached_bytes = cached
+            if time.monotonic() < expires_at:
+                return cached_result, True, cached_bytes
+            _result_cache.pop(key)
+
+    result, response_bytes = await _execute_upstream(
+        normalized_url, action, parameters,
+        coalesce=cacheable or is_read_only(capability),
+        lane=INTERACTIVE,
+        idempotent=is_idempotent(capability),
+    )
+
+    if result.get("success"):
+        if cacheable and ttl > 0:
+            _result_cache.set(key, (time.monotonic() + ttl, result, response_bytes), size=response_bytes)
+        note_successful_call(normalized_url, capability)
+    return result, False, response_bytes
+
+
+async def proxy_execute(
+    url: str,
+    action: str,
+    parameters: dict,
+    *,
+    coalesce: bool = False,
+    lane: str = INTERACTIVE,
+    idempotent: bool = False,
+) -> dict:
+    """POST an action to the extension's /execute.
+
+    coalesce=True (only for read-only actions) makes concurrent identical
+    calls share one upstream request — the same singleflight the capabilities
+    fetch lock gives /capabilities. The shared result must not be mutated.
+    lane picks the scheduler queue; a shared request keeps its first caller's.
+    idempotent=True allows retries and hedging (see _send_upstream).
+    """
+    result, _ = await _execute_upstream(
+        _normalized_extension_url(url), action, parameters,
+        coalesce=coalesce, lane=lane, idempotent=idempotent,
+    )
+    return result
+
+
+async def _execute_upstream(
+    normalized_url: str,
+    action: str,
+    parameters: dict,
+    *,
+    coalesce: bool,
+    lane: str,
+    idempotent: bool,
+) -> tuple[dict, int]:
+    # (result, response body bytes); timed for jesseverse_proxy_execute_seconds
+    started = time.perf_counter()
+    try:
+        return await _proxy_execute(normalized_url, action, parameters, coalesce, lane, idempotent)
+    finally:
+        _proxy_execute_seconds.observe(
+            time.perf_counter() - started, _extension_label(normalized_url), action,
+        )
+
+
+async def _proxy_execute(
+    normalized_url: str,
+    action: str,
+    parameters: dict,
+    coalesce: bool,
+    lane: str,
+    idempotent: bool,
+) -> tuple[dict, int]:
+    if not coalesce or not _settings.execute_coalescing:
+        return await _post_execute(normalized_url, action, parameters, lane, idempotent)
+
+    key = (*_execute_key(normalized_url, action, parameters), lane)
+    task = _inflight_executes.get(key)
+    if task is None:
+        task = asyncio.get_running_loop().create_task(
+            _post_execute(normalized_url, action, parameters, lane, idempotent)
+        )
+        _inflight_executes[key] = task
+        task.add_done_callback(lambda _: _inflight_executes.pop(key, None))
+    # shield so one caller giving up doesn't cancel the request for the others
+    return await asyncio.shield(task)
+
+
+async def _post_execute(
+    normalized_url: str,
+    action: str,
+    parameters: dict,
+    lane: str = INTERACTIVE,
+    idempotent: bool = False,
+) -> tuple[dict, int]:
     client = get_http_client()
-    resp = await client.post(
+    resp = await _send_upstream(normalized_url, f"execute:{action}", lambda timeout: client.post(
         f"{normalized_url}/execute",
         json={"action": action, "parameters": parameters},
-        timeout=30,
-    )
+        timeout=timeout,
+    ), lane, idempotent=idempotent)
     if not resp.is_success:
         # capture the full response body so callers can log the real error
         try:
@@ -383,4 +1498,161 @@ async def proxy_execute(url: str, action: str, parameters: dict) -> dict:
         raise RuntimeError(
             f"HTTP {resp.status_code} from extension:\n{detail}"
         )
-    return resp.json()
+    return resp.json(), len(resp.content)
+
+
+# ── async jobs ─────────────────────────────────────────────────────────────────
+
+job_runner = JobRunner(
+    workers=_settings.job_workers,
+    max_queue=_settings.job_queue_size,
+    retention_seconds=_settings.job_retention_seconds,
+    max_retained=_settings.job_max_retained,
+)
+
+
+def submit_job(
+    extension_name: str,
+    url: str,
+    action: str,
+    parameters: dict,
+    capability: dict | None = None,
+    *,
+    prompt: str | None = None,
+    source: str = "hub",
+) -> Job:
+    """Queue an execute as a background job (see jobs.py) and return it.
+
+    The job goes through run_action like a direct call and writes the same
+    audit row when it finishes. Its spans continue the submitting trace.
+    Raises JobQueueFull when the queue is full.
+    """
+    traceparent = trace_headers().get("traceparent")
+
+    async def run() -> dict:
+        request_bytes = execute_request_bytes(action, parameters)
+        with span("extensions.job", traceparent=traceparent, extension=extension_name, action=action):
+            started = time.perf_counter()
+            try:
+                result, cache_hit, response_bytes = await run_action(url, action, parameters, capability)
+            except Exception as exc:
+                await log_action(
+                    extension_name=extension_name, action=action, params=parameters,
+                    success=False, error=str(exc), prompt=prompt, source=source,
+                    duration_ms=elapsed_ms(started), request_bytes=request_bytes,
+                )
+                raise
+            duration_ms = elapsed_ms(started)
+            await log_action(
+                extension_name=extension_name, action=action, params=parameters,
+                success=result.get("success", True),
+                error=result.get("error"),
+                result_summary=summarize(result.get("data")),
+                prompt=prompt,
+                source=source,
+                cache_hit=cache_hit,
+                duration_ms=duration_ms,
+                request_bytes=request_bytes,
+                response_bytes=response_bytes,
+            )
+            return result
+
+    return job_runner.submit(extension_name, action, run)
+
+
+# ── batch execute ──────────────────────────────────────────────────────────────
+
+@traced("extensions.run_batch")
+async def run_batch(
+    items: list[dict],
+    *,
+    concurrency: int | None = None,
+    source: str = "hub",
+    prompt: str | None = None,
+    require_online: bool = False,
+) -> list[dict]:
+    """Run several {extension, action, parameters} calls concurrently.
+
+    The registry is read once and each distinct extension's capabilities are
+    fetched once for the whole batch. Results come back in input order, one
+    {extension, action, success, data?, error?, cache_hit} dict per item; a
+    failing item never fails the batch.
+    """
+    limit = min(concurrency or _settings.batch_default_concurrency, _settings.batch_max_concurrency)
+    registry = await _registry()
+
+    # one capabilities lookup per distinct extension
+    names = sorted({item["extension"] for item in items if item["extension"] in registry})
+    caps_results = await asyncio.gather(
+        *(fetch_capabilities(registry[name]["url"], use_cache=True) for name in names),
+        return_exceptions=True,
+    )
+    caps_by_name: dict[str, list[dict] | None] = {
+        name: (None if isinstance(caps, BaseException) else caps)
+        for name, caps in zip(names, caps_results)
+    }
+
+    semaphore = asyncio.Semaphore(max(1, limit))
+    results: list[dict | None] = [None] * len(items)
+
+    async def run_one(index: int, item: dict) -> None:
+        name, action = item["extension"], item["action"]
+        parameters = item.get("parameters") or {}
+        out = {"extension": name, "action": action, "success": False, "cache_hit": False}
+        results[index] = out
+
+        request_bytes = execute_request_bytes(action, parameters)
+
+        async def fail(error: str, duration_ms: int | None = None) -> None:
+            out["error"] = error
+            await log_action(
+                extension_name=name, action=action, params=parameters,
+                success=False, error=error, prompt=prompt, source=source,
+                duration_ms=duration_ms, request_bytes=request_bytes,
+            )
+
+        ext = registry.get(name)
+        if ext is None:
+            return await fail(f"extension '{name}' not found; known: {sorted(registry)}")
+        vis = ext.get("visibility") or "online"
+        if require_online and vis != "online":
+            return await fail(f"extension is not online (visibility={vis})")
+        caps = caps_by_name.get(name)
+        if caps is not None and find_capability(caps, action) is None:
+            return await fail(f"action '{action}' not found; valid: {[c.get('name') for c in caps]}")
+        invalid = validate_parameters(ext["url"], caps, action, parameters)
+        if invalid:
+            return await fail(invalid)
+
+        async with semaphore:
+            started = time.perf_counter()  # the call itself, not the wait for a batch slot
+            try:
+                result, cache_hit, response_bytes = await run_action(
+                    ext["url"], action, parameters, find_capability(caps, action),
+                )
+            except Exception as exc:
+                return await fail(str(exc), elapsed_ms(started))
+            duration_ms = elapsed_ms(started)
+
+        out["success"] = bool(result.get("success", True))
+        out["cache_hit"] = cache_hit
+        if result.get("data") is not None:
+            out["data"] = result["data"]
+        if result.get("error"):
+            out["error"] = result["error"]
+
+        await log_action(
+            extension_name=name, action=action, params=parameters,
+            success=result.get("success", True),
+            error=result.get("error"),
+            result_summary=summarize(result.get("data")),
+            prompt=prompt,
+            source=source,
+            cache_hit=cache_hit,
+            duration_ms=duration_ms,
+            request_bytes=request_bytes,
+            response_bytes=response_bytes,
+        )
+
+    await asyncio.gather(*(run_one(i, item) for i, item in enumerate(items)))
+    return results
@@ -0,0 +1,75 @@
+# bounded result summaries for action_logs.result_summary
+#
+# the audit log keeps only the first 500 characters of a result, but
+# json.dumps(data)[:500] serializes the entire payload first. summarize()
+# walks the value and stops as soon as the budget is spent, so the cost is
+# proportional to the summary, not to the result.
+import json
+from typing import Any
+
+SUMMARY_CHARS = 500
+
+
+class _BudgetReached(Exception):
+    pass
+
+
+class _Writer:
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self.parts: list[str] = []
+        self.size = 0
+
+    @property
+    def remaining(self) -> int:
+        return self.limit - self.size
+
+    def write(self, text: str) -> None:
+        self.parts.append(text)
+        self.size += len(text)
+        if self.size > self.limit:
+            raise _BudgetReached
+
+
+def _emit(value: Any, out: _Writer) -> None:
+    # same layout as json.dumps(value, default=str): ", " and ": " separators
+    if isinstance(value, dict):
+        out.write("{")
+        for i, (key, item) in enumerate(value.items()):
+            if i:
+                out.write(", ")
+            out.write(json.dumps(key if isinstance(key, str) else str(key)))
+            out.write(": ")
+            _emit(item, out)
+        out.write("}")
+    elif isinstance(value, (list, tuple)):
+        out.write("[")
+        for i, item in enumerate(value):
+            if i:
+                out.write(", ")
+            _emit(item, out)
+        out.write("]")
+    elif isinstance(value, str):
+        # don't escape a huge string just to keep its first few hundred chars
+        out.write(json.dumps(value[: out.remaining + 1]))
+    else:
+        out.write(json.dumps(value, default=str))
+
+
+def summarize(data: Any, limit: int = SUMMARY_CHARS) -> str | None:
+    """Compact JSON of `data` cut to `limit` chars ("…" appended when cut)."""
+    if data is None:
+        return None
+    out = _Writer(limit)
+    try:
+        _emit(data, out)
+    except _BudgetReached:
+        return "".join(out.parts)[:limit] + "…"
+    except Exception:
+        return None
+    return "".join(out.parts)
+
+
+def truncate(text: str, limit: int = SUMMARY_CHARS) -> str:
+    """Summary cut from text that was already serialized for another purpose."""
+    return text[:limit] + ("…" if len(text) > limit else "")
@@ -0,0 +1,76 @@
+# local checks of execute parameters against an action's /capabilities schema
+#
+# each action's `parameters` list is compiled once into a tuple of per-field
+# checks (required, type, enum), so validating a call is a few dict lookups
+# and isinstance tests. only what the schema states is enforced: unknown
+# types skip the type check, and parameters the schema doesn't list are
+# passed through for the extension to judge.
+from collections.abc import Callable
+
+# bool is an int subclass, so number/integer checks exclude it explicitly
+_TYPE_CHECKS: dict[str, Callable[[object], bool]] = {
+    "string": lambda v: isinstance(v, str),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "integer": lambda v: (isinstance(v, int) and not isinstance(v, bool))
+    or (isinstance(v, float) and v.is_integer()),
+    "boolean": lambda v: isinstance(v, bool),
+    "object": lambda v: isinstance(v, dict),
+    "array": lambda v: isinstance(v, list),
+}
+_TYPE_ALIASES = {"str": "string", "int": "integer", "float": "number", "bool": "boolean", "dict": "object", "list": "array"}
+
+_JSON_TYPE_NAMES = {str: "string", bool: "boolean", int: "integer", float: "number", dict: "object", list: "array"}
+
+
+def _json_type(value: object) -> str:
+    return "null" if value is None else _JSON_TYPE_NAMES.get(type(value), type(value).__name__)
+
+
+class _Field:
+    __slots__ = ("name", "required", "type", "check", "enum")
+
+    def __init__(self, spec: dict) -> None:
+        self.name = str(spec["name"])
+        self.required = bool(spec.get("required"))
+        declared = str(spec.get("type") or "").strip().lower()
+        self.type = _TYPE_ALIASES.get(declared, declared)
+        self.check = _TYPE_CHECKS.get(self.type)
+        enum = spec.get("enum")
+        self.enum = tuple(enum) if isinstance(enum, list) and enum else None
+
+
+class ParameterValidator:
+    """Compiled from one capability's `parameters`; call errors() per request."""
+
+    __slots__ = ("action", "fields")
+
+    def __init__(self, capability: dict) -> None:
+        self.action = capability.get("name", "")
+        specs = capability.get("parameters") or []
+        self.fields = tuple(
+            _Field(spec) for spec in specs if isinstance(spec, dict) and spec.get("name")
+        )
+
+    def errors(self, parameters: object) -> list[str]:
+        """Every problem with `parameters`, in schema order; empty when valid."""
+        if not isinstance(parameters, dict):
+            return [f"parameters must be an object, got {_json_type(parameters)}"]
+        problems = []
+        for field in self.fields:
+            value = parameters.get(field.name)
+            if value is None:
+                # null is treated as omitted
+                if field.required:
+                    problems.append(f"missing required parameter '{field.name}'")
+                continue
+            if field.check is not None and not field.check(value):
+                problems.append(f"'{field.name}' must be {field.type}, got {_json_type(value)}")
+                continue
+            if field.enum is not None and value not in field.enum:
+                allowed = " | ".join(str(v) for v in field.enum)
+                problems.append(f"'{field.name}' must be one of {allowed}, got {value!r}")
+        return problems
+
+
+def format_errors(action: str, problems: list[str]) -> str:
+    return f"invalid parameters for '{action}': " + "; ".join(problems)
@@ -1,10 +1,15 @@
-from fastapi import FastAPI
+from contextlib import AsyncExitStack
+
+from fastapi import FastAPI, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
 from app.core.config import get_settings
+from app.core.metrics import CONTENT_TYPE, REGISTRY
+from app.core.tracing import TracingMiddleware, recent_traces
 from app.extensions import service as ext_service
 from app.extensions.router import router as extensions_router
-from app.mcp.server import mcp_asgi_app
+from app.mcp.server import mcp_asgi_app, mcp_session_manager
 from app.reminders.router import router as reminders_router
 
 settings = get_settings()
@@ -23,22 +28,61 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["x-trace-id"],
 )
+# outermost, so the root span covers cors handling and the full response body
+app.add_middleware(TracingMiddleware)
+
+
+# long-lived resources entered at startup and closed in reverse at shutdown
+_lifespan = AsyncExitStack()
 
 
 @app.on_event("startup")
 async def _startup() -> None:
     ext_service.get_http_client()
+    if settings.mcp_mode == "session":
+        await _lifespan.enter_async_context(mcp_session_manager())
 
 
 @app.on_event("shutdown")
 async def _shutdown() -> None:
+    # end mcp sessions first so their in-flight tool calls can still log
+    await _lifespan.aclose()
+    # then let queued jobs finish — they write audit rows too
+    await ext_service.job_runner.drain(settings.job_drain_timeout_seconds)
+    await ext_service.action_log_writer.drain()
     await ext_service.close_http_client()
 
 
+# the stats read in-process state owned by the event loop, so these handlers
+# are async and run on the loop rather than in the threadpool
 @app.get("/api/health")
-def health():
-    return {"status": "ok"}
+async def health():
+    return {
+        "status": "ok",
+        "action_log_writer": ext_service.action_log_writer.stats(),
+        "capabilities_cache": ext_service.capabilities_cache_stats(),
+        "result_cache": ext_service.result_cache_stats(),
+        "upstream_scheduler": ext_service.scheduler_stats(),
+        "upstream_retries": ext_service.retry_stats(),
+        "jobs": ext_service.job_runner.stats(),
+    }
+
+
+@app.get("/api/metrics", response_class=PlainTextResponse)
+async def metrics():
+    # prometheus text exposition; scrape this instead of polling /api/health
+    return PlainTextResponse(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+
+@app.get("/api/traces")
+async def traces(
+    limit: int = Query(20, ge=1, le=200),
+    trace_id: str | None = Query(None, description="Only this trace (x-trace-id / action_logs.trace_id)"),
+):
+    # recent finished spans from the in-memory ring buffer, grouped by trace
+    return {"traces": recent_traces(limit=limit, trace_id=trace_id)}
 
 
 # extension registry rest api
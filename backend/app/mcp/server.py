@@ -1,20 +1,29 @@
 # jesseverse mcp server
-# exposes tools: list_extensions, use, check_reminders,
-#                morning_briefing, create_trigger, list_triggers, delete_trigger
+# exposes tools: list_extensions, search_capabilities, use, use_batch, get_job_result,
+#                check_reminders, morning_briefing, create_trigger, list_triggers,
+#                delete_trigger
 # auth: static bearer token from .env (MCP_TOKEN)
 #
 # mcp client config (claude desktop / cursor):
 #   { "mcpServers": { "jesseverse": { "url": "https://jesseverse-backend.vercel.app/mcp",
 #                                     "headers": { "Authorization": "Bearer <MCP_TOKEN>" } } } }
 import json
+import time
+from contextlib import asynccontextmanager
 
 import anyio
 from mcp.server.fastmcp import FastMCP
 from mcp.server.streamable_http import StreamableHTTPServerTransport
+from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
 from starlette.types import ASGIApp, Receive, Scope, Send
 
 from app.core.config import get_settings
+from app.core.metrics import REGISTRY
+from app.core.tracing import span, traced
 from app.extensions import service as ext_service
+from app.extensions.jobs import JobQueueFull
+from app.extensions.search import CapabilityIndex
+from app.extensions.summarize import summarize, truncate
 from app.reminders import service as rem_service
 
 _settings = get_settings()
@@ -40,63 +49,199 @@ def _format_param(p: dict) -> str:
     return line
 
 
-@mcp.tool()
-async def list_extensions() -> str:
-    """List every registered extension and the actions each one supports,
-    including all parameter types, descriptions, and accepted values.
-    ALWAYS call this before use() — extension slugs and action names must be
-    exact matches from this output or use() will fail."""
-    all_extensions = ext_service.list_extensions()
-    # only expose extensions that are actively online
-    extensions = [e for e in all_extensions if (e.get("visibility") or "online") == "online"]
-    if not extensions:
-        return "No extensions registered yet. Add one via POST /api/extensions."
-
+# ── rendered catalog ─────────────────────────────────────────────────────────────
+# list_extensions is called before nearly every use(), so its text is rendered
+# once and reused while the key — (registry digest, capabilities version) —
+# holds and no included capabilities have gone stale. circuit annotations are
+# live state, applied per call to the cached per-extension blocks. the search
+# index for search_capabilities is built from the same snapshot on first use.
+
+class _Catalog:
+    __slots__ = ("key", "expires_at", "blocks", "text", "capabilities", "_index")
+
+    def __init__(
+        self,
+        key: tuple[str, int],
+        expires_at: float,
+        blocks: list[tuple[str, str, str]],
+        capabilities: list[tuple[dict, list[dict]]],
+    ) -> None:
+        self.key = key
+        self.expires_at = expires_at
+        self.blocks = blocks  # (extension url, header line, capabilities text)
+        self.text = "\n\n".join(f"{header}\n{caps}" for _, header, caps in blocks)
+        self.capabilities = capabilities  # (extension row, its capabilities), fetched ok
+        self._index: CapabilityIndex | None = None
+
+    @property
+    def index(self) -> CapabilityIndex:
+        if self._index is None:
+            index = CapabilityIndex()
+            for ext, caps in self.capabilities:
+                for cap in caps:
+                    if isinstance(cap, dict) and cap.get("name"):
+                        index.add(ext, cap)
+            self._index = index
+        return self._index
+
+
+_catalog: _Catalog | None = None
+_catalog_lock = anyio.Lock()
+_UNREACHABLE = "  (backend currently unreachable — calls will fail fast)"
+# a catalog holding a fetch error is kept this long, so a down extension
+# doesn't make every list_extensions call rebuild (and re-poll) the catalog
+_CATALOG_ERROR_TTL_SECONDS = 5.0
+_SEARCH_MAX_LIMIT = 50
+
+
+def _render_capabilities(caps: list[dict]) -> str:
+    cap_lines = []
+    for cap in caps:
+        params = cap.get("parameters") or []
+        cap_lines.append(f"  • {cap['name']}: {cap.get('description', '')}")
+        if params:
+            for p in params:
+                cap_lines.append(_format_param(p))
+        else:
+            cap_lines.append("      (no parameters)")
+    return "\n".join(cap_lines) if cap_lines else "  (no capabilities returned)"
+
+
+async def _build_catalog(extensions: list[dict], registry_digest: str) -> _Catalog:
+    version = ext_service.capabilities_version()
     semaphore = anyio.Semaphore(_EXTENSION_POLL_CONCURRENCY)
-    results: list[str | None] = [None] * len(extensions)
+    blocks: list[tuple[str, str, str]] = [("", "", "")] * len(extensions)
+    rendered: dict[str, list[dict] | None] = {}
+    ttl = _settings.capabilities_cache_ttl_seconds
+    expires_at = time.time() + ttl
 
-    async def build_extension_line(index: int, ext: dict) -> None:
+    async def build_extension_block(index: int, ext: dict) -> None:
+        nonlocal expires_at
         async with semaphore:
             try:
                 caps = await ext_service.fetch_capabilities(ext["url"], use_cache=True)
-                cap_lines = []
-                for cap in caps:
-                    params = cap.get("parameters") or []
-                    cap_lines.append(
-                        f"  • {cap['name']}: {cap.get('description', '')}"
-                    )
-                    if params:
-                        for p in params:
-                            cap_lines.append(_format_param(p))
-                    else:
-                        cap_lines.append("      (no parameters)")
-                caps_text = (
-                    "\n".join(cap_lines) if cap_lines else "  (no capabilities returned)"
-                )
+                caps_text = _render_capabilities(caps)
+                rendered[ext["url"]] = caps
+                # rebuild once these capabilities are due a refresh
+                cached = ext_service.peek_capabilities(ext["url"])
+                if cached is not None:
+                    expires_at = min(expires_at, cached[0] + ttl)
             except Exception as e:
                 caps_text = f"  (could not fetch capabilities: {e})"
+                rendered[ext["url"]] = None
+                expires_at = min(expires_at, time.time() + _CATALOG_ERROR_TTL_SECONDS)
 
             header = f"[{ext['name']}] {ext.get('title', ext['name'])} — {ext.get('description', '')}"
-            results[index] = f"{header}\n{caps_text}"
+            blocks[index] = (ext["url"], header, caps_text)
 
     async with anyio.create_task_group() as tg:
         for idx, ext in enumerate(extensions):
-            tg.start_soon(build_extension_line, idx, ext)
+            tg.start_soon(build_extension_block, idx, ext)
+
+    # the build's own fetches bump the capabilities version. if every cache
+    # entry is still the one rendered (or still absent, for a failed fetch),
+    # the new version describes this catalog; otherwise keep the old one so
+    # the next call rebuilds
+    current = ext_service.capabilities_version()
+    if current != version and all(
+        (ext_service.peek_capabilities(url) or (0, None))[1] is caps
+        for url, caps in rendered.items()
+    ):
+        version = current
+    capabilities = [(ext, rendered[ext["url"]]) for ext in extensions if rendered.get(ext["url"])]
+    return _Catalog((registry_digest, version), expires_at, blocks, capabilities)
+
+
+async def _current_catalog() -> _Catalog | None:
+    global _catalog
+    extensions, registry_digest = await ext_service.online_extensions()
+    if not extensions:
+        return None
+    key = (registry_digest, ext_service.capabilities_version())
+    catalog = _catalog
+    if catalog is not None and catalog.key == key and time.time() < catalog.expires_at:
+        return catalog
+    async with _catalog_lock:
+        # concurrent callers share one rebuild
+        catalog = _catalog
+        if catalog is not None and catalog.key == key and time.time() < catalog.expires_at:
+            return catalog
+        catalog = _catalog = await _build_catalog(extensions, registry_digest)
+        return catalog
 
-    return "\n\n".join(line for line in results if line)
+
+@mcp.tool()
+@traced("mcp.tool.list_extensions")
+async def list_extensions() -> str:
+    """List every registered extension and the actions each one supports,
+    including all parameter types, descriptions, and accepted values.
+    ALWAYS call this (or search_capabilities) before use() — extension slugs
+    and action names must be exact matches from this output or use() will fail."""
+    # only actively online extensions are exposed
+    catalog = await _current_catalog()
+    if catalog is None:
+        return "No extensions registered yet. Add one via POST /api/extensions."
+    if not any(ext_service.is_circuit_open(url) for url, _, _ in catalog.blocks):
+        return catalog.text
+    return "\n\n".join(
+        f"{header}{_UNREACHABLE if ext_service.is_circuit_open(url) else ''}\n{caps}"
+        for url, header, caps in catalog.blocks
+    )
 
 
 @mcp.tool()
-async def use(extension: str, action: str, parameters: dict, prompt: str | None = None) -> str:
+@traced("mcp.tool.search_capabilities")
+async def search_capabilities(query: str, limit: int = 10) -> str:
+    """Find the extension actions that best match a description of what you
+    want to do, with their full parameter schemas. Cheaper than
+    list_extensions() when there are many extensions — use it first and fall
+    back to list_extensions() if nothing relevant comes back.
+
+    Args:
+        query: Keywords describing the task, e.g. "add job application" or "weather forecast".
+        limit: Maximum number of actions to return (1–50, default 10).
+    """
+    catalog = await _current_catalog()
+    if catalog is None:
+        return "No extensions registered yet. Add one via POST /api/extensions."
+    limit = max(1, min(limit, _SEARCH_MAX_LIMIT))
+    hits = catalog.index.search(query, limit)
+    if not hits:
+        return f"No actions match {query!r}. Call list_extensions() to see everything available."
+
+    lines = [f"Top {len(hits)} action(s) for {query!r} — pass extension and action to use() exactly as shown:"]
+    for _, ext, cap in hits:
+        header = f"\n[{ext['name']}] {cap['name']}: {cap.get('description', '')}"
+        if ext_service.is_circuit_open(ext["url"]):
+            header += _UNREACHABLE
+        lines.append(header)
+        params = cap.get("parameters") or []
+        if params:
+            lines.extend(_format_param(p) for p in params)
+        else:
+            lines.append("      (no parameters)")
+    return "\n".join(lines)
+
+
+@mcp.tool()
+@traced("mcp.tool.use")
+async def use(
+    extension: str,
+    action: str,
+    parameters: dict,
+    prompt: str | None = None,
+    run_async: bool = False,
+) -> str:
     """Execute an action on a registered extension.
 
-    IMPORTANT — you must call list_extensions() first to get exact extension
-    slugs and action names. Both values are case-sensitive exact matches.
-    Do NOT guess or infer them; always look them up before calling this.
+    IMPORTANT — you must call list_extensions() or search_capabilities() first
+    to get exact extension slugs and action names. Both values are
+    case-sensitive exact matches. Do NOT guess or infer them; always look them
+    up before calling this.
 
     Workflow:
-      1. list_extensions()  — discover extensions, actions, and parameter schemas.
-      2. use()              — call with the exact slug and action name from step 1.
+      1. search_capabilities() or list_extensions()  — discover actions and parameter schemas.
+      2. use()  — call with the exact slug and action name from step 1.
 
     Args:
         extension: Extension slug exactly as returned by list_extensions(), e.g. "3mplymnt".
@@ -104,11 +249,14 @@ async def use(extension: str, action: str, parameters: dict, prompt: str | None
         parameters: Dict matching the parameter schema. Include all required fields;
                     omit optional ones you don't need. Use {} when no params needed.
         prompt: Optional one-line description of why this is being called (shown in audit log).
+        run_async: Set true for slow actions: returns a job id immediately instead of
+                   waiting; then call get_job_result(job_id) to collect the result.
+                   Only available when the server has async jobs enabled.
     """
-    ext = ext_service.get_extension(extension)
+    ext = await ext_service.get_extension(extension)
     if not ext:
-        known = [e["name"] for e in ext_service.list_extensions() if (e.get("visibility") or "online") == "online"]
-        ext_service.log_action(
+        known = [e["name"] for e in (await ext_service.online_extensions())[0]]
+        await ext_service.log_action(
             extension_name=extension, action=action, params=parameters,
             success=False,
             error=f"extension not found; known: {known}",
@@ -123,7 +271,7 @@ async def use(extension: str, action: str, parameters: dict, prompt: str | None
     # block calls to extensions that aren't actively online
     vis = ext.get("visibility") or "online"
     if vis != "online":
-        ext_service.log_action(
+        await ext_service.log_action(
             extension_name=extension, action=action, params=parameters,
             success=False,
             error=f"extension is not online (visibility={vis})",
@@ -136,11 +284,12 @@ async def use(extension: str, action: str, parameters: dict, prompt: str | None
     endpoint = f"{ext['url']}/execute"
 
     # validate the action name against the extension's capability list before proxying
+    capability: dict | None = None
     try:
         caps = await ext_service.fetch_capabilities(ext["url"], use_cache=True)
         valid_actions = [c["name"] for c in caps]
         if action not in valid_actions:
-            ext_service.log_action(
+            await ext_service.log_action(
                 extension_name=extension, action=action, params=parameters,
                 success=False,
                 error=f"action '{action}' not found; valid: {valid_actions}",
@@ -152,49 +301,172 @@ async def use(extension: str, action: str, parameters: dict, prompt: str | None
                 f"Valid actions: {', '.join(valid_actions)}.\n"
                 f"Check the exact name with list_extensions()."
             )
+        capability = ext_service.find_capability(caps, action)
     except Exception as cap_err:
         # capabilities fetch failed — proceed anyway, let the extension return its own error
-        pass
+        caps = None
 
+    # required / type / enum checks against the cached schema, no round-trip
+    invalid = ext_service.validate_parameters(ext["url"], caps, action, parameters)
+    if invalid:
+        await ext_service.log_action(
+            extension_name=extension, action=action, params=parameters,
+            success=False, error=invalid, prompt=prompt, source="poke",
+        )
+        schema = "\n".join(_format_param(p) for p in capability.get("parameters") or [])
+        return f"Rejected before calling {endpoint}: {invalid}.\nParameters for '{action}':\n{schema}"
+
+    if run_async and not _settings.async_jobs:
+        return (
+            "run_async isn't available on this server (async jobs are disabled). "
+            "Call use() again without run_async."
+        )
+    if run_async:
+        try:
+            job = ext_service.submit_job(
+                extension, ext["url"], action, parameters, capability, prompt=prompt, source="poke",
+            )
+        except JobQueueFull as e:
+            return f"Could not start {extension}.{action}: {e}"
+        return (
+            f"Started job {job.id} ({extension}.{action}).\n"
+            f'Call get_job_result("{job.id}") to collect the result — each call waits up to '
+            f"{_settings.job_max_wait_seconds:.0f}s for it to finish."
+        )
+
+    request_bytes = ext_service.execute_request_bytes(action, parameters)
+    started = time.perf_counter()
     try:
-        result = await ext_service.proxy_execute(ext["url"], action, parameters)
+        result, cache_hit, response_bytes = await ext_service.run_action(ext["url"], action, parameters, capability)
     except Exception as e:
-        ext_service.log_action(
+        await ext_service.log_action(
             extension_name=extension, action=action, params=parameters,
             success=False, error=str(e), prompt=prompt, source="poke",
+            duration_ms=ext_service.elapsed_ms(started), request_bytes=request_bytes,
         )
         return f"Error calling {endpoint}: {e}"
+    duration_ms = ext_service.elapsed_ms(started)
 
-    result_summary: str | None = None
-    if result.get("data") is not None:
-        try:
-            serialized = json.dumps(result["data"], default=str)
-            result_summary = serialized[:500] + ("…" if len(serialized) > 500 else "")
-        except Exception:
-            pass
-
-    ext_service.log_action(
+    # successful data is serialized once: the same text is the tool output and,
+    # truncated, the audit summary
+    data = result.get("data")
+    rendered: str | None = None
+    if data is not None and result.get("success"):
+        rendered = json.dumps(data, indent=2, default=str)
+        result_summary = truncate(rendered)
+    else:
+        result_summary = summarize(data)
+
+    await ext_service.log_action(
         extension_name=extension, action=action, params=parameters,
         success=result.get("success", True),
         error=result.get("error"),
         result_summary=result_summary,
         prompt=prompt,
         source="poke",
+        cache_hit=cache_hit,
+        duration_ms=duration_ms,
+        request_bytes=request_bytes,
+        response_bytes=response_bytes,
     )
 
+    return _result_text(endpoint, action, result, rendered)
+
+
+def _result_text(endpoint: str, action: str, result: dict, rendered: str | None = None) -> str:
+    # tool output for an execute result; rendered is the data already
+    # serialized, when the caller has it
     if not result.get("success"):
         err = result.get("error", "Unknown error")
         return (
             f"Error from {endpoint} ({action}): {err}\n"
             f"Hint: call list_extensions() to verify the action name and parameter names."
         )
-    data = result.get("data")
-    if data is not None:
-        return f"# endpoint: {endpoint}\n{json.dumps(data, indent=2, default=str)}"
+    if rendered is None and result.get("data") is not None:
+        rendered = json.dumps(result["data"], indent=2, default=str)
+    if rendered is not None:
+        return f"# endpoint: {endpoint}\n{rendered}"
     return f"Done. (endpoint: {endpoint})"
 
 
 @mcp.tool()
+@traced("mcp.tool.get_job_result")
+async def get_job_result(job_id: str, wait_seconds: float = 20) -> str:
+    """Collect the result of a job started with use(..., run_async=True).
+
+    Waits up to wait_seconds (capped server-side) for the job to finish. If it
+    is still running when that time is up, call this again with the same id.
+
+    Args:
+        job_id: The id returned by use() when run_async was set.
+        wait_seconds: How long to wait for a running job before returning (default 20).
+    """
+    wait = min(max(wait_seconds, 0.0), _settings.job_max_wait_seconds)
+    job = await ext_service.job_runner.wait(job_id, wait)
+    if job is None:
+        minutes = _settings.job_retention_seconds // 60
+        return f"Job '{job_id}' not found — unknown id, or it finished more than {minutes} minutes ago."
+    if not job.done:
+        elapsed = time.time() - job.created_at
+        return (
+            f"Job {job.id} ({job.extension}.{job.action}) is still {job.status} after {elapsed:.0f}s. "
+            f"Call get_job_result again to keep waiting."
+        )
+    ext = await ext_service.get_extension(job.extension)
+    endpoint = f"{ext['url']}/execute" if ext else f"{job.extension}/execute"
+    if job.result is None:
+        return f"Error calling {endpoint}: {job.error}"
+    return _result_text(endpoint, job.action, job.result)
+
+
+@mcp.tool()
+@traced("mcp.tool.use_batch")
+async def use_batch(calls: list[dict], concurrency: int = 5, prompt: str | None = None) -> str:
+    """Execute several actions at once, across one or more extensions.
+
+    Use this instead of calling use() repeatedly when you already know every
+    action you need — the calls run concurrently and results come back in the
+    same order. One failing call does not stop the others.
+
+    Args:
+        calls: List of {"extension": "<slug>", "action": "<name>", "parameters": {...}}
+               using exact slugs and action names from list_extensions().
+        concurrency: Max calls in flight at once (default 5).
+        prompt: Optional one-line description of why these are being called (shown in audit log).
+    """
+    max_items = _settings.batch_max_items
+    if not calls:
+        return "No calls given."
+    if len(calls) > max_items:
+        return f"Too many calls ({len(calls)}); the limit is {max_items} per batch."
+    items: list[dict] = []
+    for i, call in enumerate(calls):
+        if not isinstance(call, dict) or not call.get("extension") or not call.get("action"):
+            return f"Call #{i + 1} must be an object with 'extension' and 'action' (and optional 'parameters')."
+        items.append({
+            "extension": call["extension"],
+            "action": call["action"],
+            "parameters": call.get("parameters") or {},
+        })
+
+    results = await ext_service.run_batch(
+        items, concurrency=concurrency, source="poke", prompt=prompt, require_online=True,
+    )
+
+    sections: list[str] = []
+    for i, r in enumerate(results, start=1):
+        header = f"## {i}. {r['extension']}.{r['action']}"
+        if not r["success"]:
+            sections.append(f"{header} — ERROR\n{r.get('error', 'Unknown error')}")
+        elif r.get("data") is not None:
+            sections.append(f"{header}\n{json.dumps(r['data'], indent=2, default=str)}")
+        else:
+            sections.append(f"{header}\nDone.")
+    return "\n\n".join(sections)
+
+
+@mcp.tool()
+@traced("mcp.tool.check_reminders")
 async def check_reminders() -> str:
     """Check for upcoming deadlines across all registered extensions.
 
@@ -207,7 +479,7 @@ async def check_reminders() -> str:
     To act on a reminder:
       - Mark done: use(extension, "<update_action>", {"id": "...", ...})
     """
-    extensions = ext_service.list_extensions()
+    extensions = await ext_service.list_extensions()
     if not extensions:
         return "No extensions registered."
 
@@ -216,9 +488,8 @@ async def check_reminders() -> str:
     for section in raw_sections:
         ext_name = section.get("extension", "?")
         label = section.get("label", "")
-        items = section.get("items") or []
-        for item in items:
-            item["_extension"] = ext_name
+        # copies: the sections may be shared with the reminders cache
+        items = [{**item, "_extension": ext_name} for item in section.get("items") or []]
         sections.append((ext_name, label, items))
 
     if not sections:
@@ -240,6 +511,7 @@ async def check_reminders() -> str:
 
 
 @mcp.tool()
+@traced("mcp.tool.morning_briefing")
 async def morning_briefing() -> str:
     """Return today's consolidated morning reminder digest.
 
@@ -252,7 +524,7 @@ async def morning_briefing() -> str:
     """
     from datetime import datetime, timezone, timedelta
 
-    latest = rem_service.get_latest_digest()
+    latest = await rem_service.get_latest_digest()
     if latest:
         generated_at = latest.get("generated_at") or ""
         try:
@@ -268,12 +540,13 @@ async def morning_briefing() -> str:
 
 
 @mcp.tool()
-def list_triggers() -> str:
+@traced("mcp.tool.list_triggers")
+async def list_triggers() -> str:
     """List all configured reminder triggers (name, schedule, enabled, last run).
 
     Triggers control when the automated morning digest is generated.
     """
-    triggers = rem_service.list_triggers()
+    triggers = await rem_service.list_triggers()
     if not triggers:
         return "No triggers configured."
     lines: list[str] = []
@@ -287,7 +560,8 @@ def list_triggers() -> str:
 
 
 @mcp.tool()
-def create_trigger(
+@traced("mcp.tool.create_trigger")
+async def create_trigger(
     name: str,
     schedule: str,
     action: str = "morning_briefing",
@@ -301,7 +575,7 @@ def create_trigger(
         action:   Action the cron endpoint should perform. Default: morning_briefing.
         timezone: IANA timezone name (e.g. "America/Toronto"). Default: UTC.
     """
-    t = rem_service.create_trigger(
+    t = await rem_service.create_trigger(
         name=name,
         schedule=schedule,
         action=action,
@@ -312,16 +586,17 @@ def create_trigger(
 
 
 @mcp.tool()
-def delete_trigger(name: str) -> str:
+@traced("mcp.tool.delete_trigger")
+async def delete_trigger(name: str) -> str:
     """Delete a reminder trigger by name.
 
     Args:
         name: Exact name of the trigger to delete (from list_triggers).
     """
-    existing = rem_service.get_trigger(name)
+    existing = await rem_service.get_trigger(name)
     if not existing:
         return f"Trigger '{name}' not found. Use list_triggers() to see valid names."
-    rem_service.delete_trigger(name)
+    await rem_service.delete_trigger(name)
     return f"Trigger '{name}' deleted."
 
 
@@ -336,13 +611,19 @@ class _BearerAuthMiddleware:
     async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         if scope["type"] == "http":
             method = scope.get("method", "")
-            if method == "POST":
-                headers = {k.lower(): v for k, v in scope.get("headers", [])}
-                auth = headers.get(b"authorization", b"").decode()
-                incoming = auth[7:] if auth.lower().startswith("bearer ") else ""
-                api_key = headers.get(b"x-api-key", b"").decode()
-                alt_api_key = headers.get(b"api-key", b"").decode()
-                if incoming != self._token and api_key != self._token and alt_api_key != self._token:
+            # get without a session id is the public probe; a get with one
+            # (session-mode sse stream) and delete (end session) need the token
+            if method == "POST" or method == "DELETE" or _session_id(scope) is not None:
+                with span("mcp.auth", activate=False) as auth_span:
+                    headers = {k.lower(): v for k, v in scope.get("headers", [])}
+                    auth = headers.get(b"authorization", b"").decode()
+                    incoming = auth[7:] if auth.lower().startswith("bearer ") else ""
+                    api_key = headers.get(b"x-api-key", b"").decode()
+                    alt_api_key = headers.get(b"api-key", b"").decode()
+                    authorized = self._token in (incoming, api_key, alt_api_key)
+                    if auth_span is not None and not authorized:
+                        auth_span.fail("invalid_token")
+                if not authorized:
                     body = json.dumps({
                         "error": "invalid_token",
                         "error_description": "Authentication required",
@@ -361,10 +642,64 @@ class _BearerAuthMiddleware:
         await self._app(scope, receive, send)
 
 
+def _session_id(scope: Scope) -> bytes | None:
+    for key, value in scope.get("headers", []):
+        if key.lower() == b"mcp-session-id":
+            return value
+    return None
+
+
+# ── session mode ─────────────────────────────────────────────────────────────────
+# one session manager for the process: clients initialize once and reuse their
+# session (and its server task) across tool calls. tool spans here belong to
+# the session's task, not to the http request that carried the call
+
+_session_manager: StreamableHTTPSessionManager | None = None
+
+
+@asynccontextmanager
+async def mcp_session_manager():
+    """Run the pooled session manager until exit (mcp_mode="session")."""
+    global _session_manager
+    manager = StreamableHTTPSessionManager(app=mcp._mcp_server, json_response=True, stateless=False)
+    async with manager.run():
+        _session_manager = manager
+        try:
+            yield manager
+        finally:
+            _session_manager = None
+
+
 # ── per-request mcp handler ──────────────────────────────────────────────────────
-# fresh StreamableHTTPServerTransport per request — stateless, vercel-compatible
+# fresh StreamableHTTPServerTransport per request — stateless, vercel-compatible.
+# used in stateless mode, and as the fallback while no session manager runs
+
+_mcp_seconds = REGISTRY.histogram(
+    "jesseverse_mcp_request_seconds",
+    "Time to handle one POST /mcp, including transport and server setup.",
+)
+_mcp_in_flight = REGISTRY.gauge("jesseverse_mcp_requests_in_flight", "POST /mcp requests being handled.")
+
 
 async def _mcp_handler(scope: Scope, receive: Receive, send: Send) -> None:
+    if scope.get("method") != "POST":
+        await _handle_mcp(scope, receive, send)
+        return
+    _mcp_in_flight.inc()
+    started = time.perf_counter()
+    try:
+        await _handle_mcp(scope, receive, send)
+    finally:
+        _mcp_in_flight.dec()
+        _mcp_seconds.observe(time.perf_counter() - started)
+
+
+async def _handle_mcp(scope: Scope, receive: Receive, send: Send) -> None:
+    manager = _session_manager
+    if manager is not None and (scope.get("method") != "GET" or _session_id(scope) is not None):
+        await manager.handle_request(scope, receive, send)
+        return
+
     # get requests are unauthenticated url-validity probes from mcp clients
     if scope.get("method") == "GET":
         body = json.dumps({
@@ -384,24 +719,29 @@ async def _mcp_handler(scope: Scope, receive: Receive, send: Send) -> None:
         return
 
     server = mcp._mcp_server  # low-level server with tools already registered
-    transport = StreamableHTTPServerTransport(
-        mcp_session_id=None,
-        is_json_response_enabled=True,
-    )
 
+    # spans here are recorded without being activated, so the server task
+    # (and the tool spans inside it) hang off the request's root span
     async with anyio.create_task_group() as tg:
-        async def run_server(*, task_status=anyio.TASK_STATUS_IGNORED) -> None:
-            async with transport.connect() as (read_stream, write_stream):
-                task_status.started()
-                await server.run(
-                    read_stream,
-                    write_stream,
-                    server.create_initialization_options(),
-                    stateless=True,
-                )
-
-        await tg.start(run_server)
-        await transport.handle_request(scope, receive, send)
+        with span("mcp.transport_setup", activate=False):
+            transport = StreamableHTTPServerTransport(
+                mcp_session_id=None,
+                is_json_response_enabled=True,
+            )
+
+            async def run_server(*, task_status=anyio.TASK_STATUS_IGNORED) -> None:
+                async with transport.connect() as (read_stream, write_stream):
+                    task_status.started()
+                    await server.run(
+                        read_stream,
+                        write_stream,
+                        server.create_initialization_options(),
+                        stateless=True,
+                    )
+
+            await tg.start(run_server)
+        with span("mcp.handle_request", activate=False):
+            await transport.handle_request(scope, receive, send)
         tg.cancel_scope.cancel()
 
 
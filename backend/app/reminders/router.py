@@ -39,9 +39,9 @@ async def run_digest(
 
 
 @router.get("/digest/latest")
-def latest_digest(_: None = Depends(require_api_key)):
+async def latest_digest(_: None = Depends(require_api_key)):
     """Return the most recently stored daily digest."""
-    row = rem_service.get_latest_digest()
+    row = await rem_service.get_latest_digest()
     if not row:
         raise HTTPException(status_code=404, detail="No digests generated yet")
     return row
@@ -50,8 +50,8 @@ def latest_digest(_: None = Depends(require_api_key)):
 # ── Trigger CRUD ───────────────────────────────────────────────────────────────
 
 @router.get("/triggers")
-def list_triggers():
-    return rem_service.list_triggers()
+async def list_triggers():
+    return await rem_service.list_triggers()
 
 
 class TriggerCreate(BaseModel):
@@ -62,8 +62,8 @@ class TriggerCreate(BaseModel):
 
 
 @router.post("/triggers", status_code=201)
-def create_trigger(body: TriggerCreate, _: None = Depends(require_api_key)):
-    return rem_service.create_trigger(
+async def create_trigger(body: TriggerCreate, _: None = Depends(require_api_key)):
+    return await rem_service.create_trigger(
         name=body.name,
         schedule=body.schedule,
         action=body.action,
@@ -72,11 +72,11 @@ def create_trigger(body: TriggerCreate, _: None = Depends(require_api_key)):
 
 
 @router.delete("/triggers/{name}", status_code=204)
-def delete_trigger(name: str, _: None = Depends(require_api_key)):
-    existing = rem_service.get_trigger(name)
+async def delete_trigger(name: str, _: None = Depends(require_api_key)):
+    existing = await rem_service.get_trigger(name)
     if not existing:
         raise HTTPException(status_code=404, detail=f"Trigger '{name}' not found")
-    rem_service.delete_trigger(name)
+    await rem_service.delete_trigger(name)
 
 
 class TriggerPatch(BaseModel):
@@ -84,9 +84,9 @@ class TriggerPatch(BaseModel):
 
 
 @router.patch("/triggers/{name}")
-def patch_trigger(name: str, body: TriggerPatch, _: None = Depends(require_api_key)):
+async def patch_trigger(name: str, body: TriggerPatch, _: None = Depends(require_api_key)):
     """Enable or disable a trigger without deleting it."""
-    existing = rem_service.get_trigger(name)
+    existing = await rem_service.get_trigger(name)
     if not existing:
         raise HTTPException(status_code=404, detail=f"Trigger '{name}' not found")
-    return rem_service.set_trigger_enabled(name, body.enabled)
+    return await rem_service.set_trigger_enabled(name, body.enabled)
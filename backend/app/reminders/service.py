@@ -17,8 +17,10 @@ from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 import anyio
 from croniter import croniter
 
-from app.core.database import get_supabase
+from app.core.database import get_supabase, run_query
 from app.extensions import service as ext_service
+from app.core.tracing import span, traced
+from app.extensions.scheduler import BACKGROUND
 
 _EXTENSION_POLL_CONCURRENCY = 5
 _REMINDER_CACHE_TTL_SECONDS = 23 * 60 * 60
@@ -33,6 +35,7 @@ def invalidate_reminder_cache() -> None:
     _reminder_sections_cache = None
 
 
+@traced("reminders.gather_all_reminders")
 async def gather_all_reminders(*, use_cache: bool = True) -> list[dict]:
     """
     Collect reminders from every online extension that has a get_reminders action.
@@ -55,9 +58,12 @@ async def gather_all_reminders(*, use_cache: bool = True) -> list[dict]:
             if now - cached_at <= _REMINDER_CACHE_TTL_SECONDS:
                 return cached_sections
 
+        # skip hosts whose circuit is open — they'd only fail fast anyway, and
+        # this keeps dead backends from holding a poll slot
         extensions = [
-            e for e in ext_service.list_extensions()
+            e for e in await ext_service.list_extensions()
             if (e.get("visibility") or "online") == "online"
+            and not ext_service.is_circuit_open(e["url"])
         ]
 
         sections_by_extension: list[list[dict]] = [[] for _ in extensions]
@@ -65,47 +71,58 @@ async def gather_all_reminders(*, use_cache: bool = True) -> list[dict]:
 
         async def gather_for_extension(index: int, ext: dict) -> None:
             async with semaphore:
-                try:
-                    caps = await ext_service.fetch_capabilities(ext["url"], use_cache=True)
-                    cap_names = {c.get("name") for c in caps}
-                    if "get_reminders" not in cap_names:
-                        return
-
-                    result = await ext_service.proxy_execute(ext["url"], "get_reminders", {})
-                    if not result.get("success"):
-                        return
-
-                    data = result.get("data")
-                    if not data:
-                        return
-
-                    ext_sections: list[dict] = []
-                    if isinstance(data, list):
-                        if data:
-                            ext_sections.append({
-                                "extension": ext["name"],
-                                "label": "",
-                                "items": data,
-                            })
-                    elif isinstance(data, dict):
-                        soon = data.get("due_within_3_days") or []
-                        week = data.get("due_within_7_days") or []
-                        if soon:
-                            ext_sections.append({
-                                "extension": ext["name"],
-                                "label": "Due within 3 days",
-                                "items": soon,
-                            })
-                        if week:
-                            ext_sections.append({
-                                "extension": ext["name"],
-                                "label": "Due within 7 days",
-                                "items": week,
-                            })
-
-                    sections_by_extension[index] = ext_sections
-                except Exception as exc:
-                    print(f"[reminders] skipping {ext['name']}: {exc}", file=sys.stderr)
+                with span("reminders.poll_extension", extension=ext["name"]):
+                    await poll_extension(index, ext)
+
+        async def poll_extension(index: int, ext: dict) -> None:
+            try:
+                caps = await ext_service.fetch_capabilities(
+                    ext["url"], use_cache=True, lane=BACKGROUND,
+                )
+                capability = ext_service.find_capability(caps, "get_reminders")
+                if capability is None:
+                    return
+
+                result = await ext_service.proxy_execute(
+                    ext["url"], "get_reminders", {},
+                    coalesce=ext_service.is_read_only(capability),
+                    lane=BACKGROUND,
+                    idempotent=ext_service.is_idempotent(capability),
+                )
+                if not result.get("success"):
+                    return
+
+                data = result.get("data")
+                if not data:
+                    return
+
+                ext_sections: list[dict] = []
+                if isinstance(data, list):
+                    if data:
+                        ext_sections.append({
+                            "extension": ext["name"],
+                            "label": "",
+                            "items": data,
+                        })
+                elif isinstance(data, dict):
+                    soon = data.get("due_within_3_days") or []
+                    week = data.get("due_within_7_days") or []
+                    if soon:
+                        ext_sections.append({
+                            "extension": ext["name"],
+                            "label": "Due within 3 days",
+                            "items": soon,
+                        })
+                    if week:
+                        ext_sections.append({
+                            "extension": ext["name"],
+                            "label": "Due within 7 days",
+                            "items": week,
+                        })
+
+                sections_by_extension[index] = ext_sections
+            except Exception as exc:
+                print(f"[reminders] skipping {ext['name']}: {exc}", file=sys.stderr)
 
         async with anyio.create_task_group() as tg:
             for idx, ext in enumerate(extensions):
@@ -169,20 +186,20 @@ async def generate_and_store_digest(trigger_name: str = "morning_briefing") -> d
     text = _format_sections(sections)
 
     db = get_supabase()
-    result = db.table("daily_digests").insert({
+    result = await run_query(db.table("daily_digests").insert({
         "sections": sections,
         "total_count": total,
         "raw_text": text,
-    }).execute()
+    }))
 
     row = (result.data or [{}])[0]
 
     # bump last_run_at on the trigger that generated this digest (best-effort)
     try:
-        db.table("triggers").update({
+        await run_query(db.table("triggers").update({
             "last_run_at": datetime.now(timezone.utc).isoformat(),
             "updated_at": datetime.now(timezone.utc).isoformat(),
-        }).eq("name", trigger_name).execute()
+        }).eq("name", trigger_name))
     except Exception:
         pass
 
@@ -191,15 +208,14 @@ async def generate_and_store_digest(trigger_name: str = "morning_briefing") -> d
     return row
 
 
-def get_latest_digest() -> dict | None:
+async def get_latest_digest() -> dict | None:
     """Return the most recently generated daily_digests row, or None."""
-    result = (
+    result = await run_query(
         get_supabase()
         .table("daily_digests")
         .select("*")
         .order("generated_at", desc=True)
         .limit(1)
-        .execute()
     )
     rows = result.data or []
     return rows[0] if rows else None
@@ -207,26 +223,26 @@ def get_latest_digest() -> dict | None:
 
 # ── Trigger CRUD ───────────────────────────────────────────────────────────────
 
-def list_triggers() -> list[dict]:
-    return get_supabase().table("triggers").select("*").order("created_at").execute().data or []
+async def list_triggers() -> list[dict]:
+    return (await run_query(get_supabase().table("triggers").select("*").order("created_at"))).data or []
 
 
-def get_trigger(name: str) -> dict | None:
+async def get_trigger(name: str) -> dict | None:
     rows = (
-        get_supabase()
-        .table("triggers")
-        .select("*")
-        .eq("name", name)
-        .limit(1)
-        .execute()
-        .data or []
-    )
+        await run_query(
+            get_supabase()
+            .table("triggers")
+            .select("*")
+            .eq("name", name)
+            .limit(1)
+        )
+    ).data or []
     return rows[0] if rows else None
 
 
-def create_trigger(name: str, schedule: str, action: str = "morning_briefing", config: dict | None = None) -> dict:
+async def create_trigger(name: str, schedule: str, action: str = "morning_briefing", config: dict | None = None) -> dict:
     db = get_supabase()
-    db.table("triggers").upsert(
+    await run_query(db.table("triggers").upsert(
         {
             "name": name,
             "schedule": schedule,
@@ -234,22 +250,22 @@ def create_trigger(name: str, schedule: str, action: str = "morning_briefing", c
             "config": config or {},
         },
         on_conflict="name",
-    ).execute()
-    rows = db.table("triggers").select("*").eq("name", name).limit(1).execute().data or []
+    ))
+    rows = (await run_query(db.table("triggers").select("*").eq("name", name).limit(1))).data or []
     return rows[0]
 
 
-def delete_trigger(name: str) -> None:
-    get_supabase().table("triggers").delete().eq("name", name).execute()
+async def delete_trigger(name: str) -> None:
+    await run_query(get_supabase().table("triggers").delete().eq("name", name))
 
 
-def set_trigger_enabled(name: str, enabled: bool) -> dict | None:
+async def set_trigger_enabled(name: str, enabled: bool) -> dict | None:
     db = get_supabase()
-    db.table("triggers").update({
+    await run_query(db.table("triggers").update({
         "enabled": enabled,
         "updated_at": datetime.now(timezone.utc).isoformat(),
-    }).eq("name", name).execute()
-    return get_trigger(name)
+    }).eq("name", name))
+    return await get_trigger(name)
 
 
 def _trigger_timezone(trigger: dict) -> ZoneInfo:
@@ -302,7 +318,7 @@ async def run_due_triggers(now_utc: datetime | None = None) -> list[dict]:
     current_utc = now_utc or datetime.now(timezone.utc)
     executed: list[dict] = []
 
-    for trigger in list_triggers():
+    for trigger in await list_triggers():
         if not trigger.get("enabled", True):
             continue
         if not _is_due_now(trigger, current_utc):
@@ -0,0 +1,148 @@
+# in-memory stand-ins for supabase-py and extension backends, used by the
+# benchmark scripts so they run offline with a controllable database latency
+import json
+import time
+from types import SimpleNamespace
+
+import httpx
+
+
+class _Query:
+    def __init__(self, db: "FakeSupabase", table: str) -> None:
+        self._db = db
+        self._table = table
+        self._op = "select"
+        self._payload = None
+        self._filters: list = []
+        self._order: tuple[str, bool] | None = None
+        self._limit: int | None = None
+        self._range: tuple[int, int] | None = None
+        self._single = False
+        self._count = False
+
+    # builders — only the subset the hub actually uses
+    def select(self, _cols: str = "*", count: str | None = None) -> "_Query":
+        self._count = count is not None
+        return self
+
+    def insert(self, payload) -> "_Query":
+        self._op, self._payload = "insert", payload
+        return self
+
+    def upsert(self, payload, on_conflict: str = "") -> "_Query":
+        self._op, self._payload = "upsert", (payload, on_conflict)
+        return self
+
+    def update(self, payload) -> "_Query":
+        self._op, self._payload = "update", payload
+        return self
+
+    def delete(self) -> "_Query":
+        self._op = "delete"
+        return self
+
+    def eq(self, col: str, value) -> "_Query":
+        self._filters.append(lambda r: r.get(col) == value)
+        return self
+
+    def in_(self, col: str, values) -> "_Query":
+        values = list(values)
+        self._filters.append(lambda r: r.get(col) in values)
+        return self
+
+    def gte(self, col: str, value) -> "_Query":
+        self._filters.append(lambda r: str(r.get(col)) >= str(value))
+        return self
+
+    def order(self, col: str, desc: bool = False) -> "_Query":
+        self._order = (col, desc)
+        return self
+
+    def limit(self, n: int) -> "_Query":
+        self._limit = n
+        return self
+
+    def range(self, start: int, end: int) -> "_Query":
+        self._range = (start, end)
+        return self
+
+    def single(self) -> "_Query":
+        self._single = True
+        return self
+
+    def execute(self):
+        time.sleep(self._db.latency)
+        self._db.calls += 1
+        rows = self._db.tables.setdefault(self._table, [])
+        if self._op == "insert":
+            batch = self._payload if isinstance(self._payload, list) else [self._payload]
+            rows.extend(json.loads(json.dumps(r, default=str)) for r in batch)
+            return SimpleNamespace(data=batch, count=None)
+        if self._op == "upsert":
+            payload, key = self._payload
+            for item in payload if isinstance(payload, list) else [payload]:
+                existing = next((r for r in rows if r.get(key) == item.get(key)), None)
+                if existing is None:
+                    rows.append(dict(item))
+                else:
+                    existing.update(item)
+            return SimpleNamespace(data=[], count=None)
+
+        matched = [r for r in rows if all(f(r) for f in self._filters)]
+        if self._op == "update":
+            for r in matched:
+                r.update(self._payload)
+            return SimpleNamespace(data=matched, count=None)
+        if self._op == "delete":
+            self._db.tables[self._table] = [r for r in rows if r not in matched]
+            return SimpleNamespace(data=matched, count=None)
+
+        total = len(matched)
+        if self._order:
+            col, desc = self._order
+            matched.sort(key=lambda r: str(r.get(col)), reverse=desc)
+        if self._range:
+            matched = matched[self._range[0]:self._range[1] + 1]
+        if self._limit is not None:
+            matched = matched[:self._limit]
+        if self._single:
+            return SimpleNamespace(data=matched[0] if matched else None, count=None)
+        return SimpleNamespace(data=[dict(r) for r in matched], count=total if self._count else None)
+
+
+class FakeSupabase:
+    """Blocking fake of the supabase-py client; every execute() sleeps `latency`."""
+
+    def __init__(self, latency: float = 0.0) -> None:
+        self.latency = latency
+        self.calls = 0
+        self.tables: dict[str, list[dict]] = {}
+
+    def table(self, name: str) -> _Query:
+        return _Query(self, name)
+
+
+def extension_transport(capabilities: list[dict], data=None, delay: float = 0.0) -> httpx.AsyncBaseTransport:
+    """httpx transport that answers /info, /capabilities and /execute like an extension."""
+    import asyncio
+
+    class _Transport(httpx.AsyncBaseTransport):
+        async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+            if delay:
+                await asyncio.sleep(delay)
+            path = request.url.path
+            if path.endswith("/info"):
+                return httpx.Response(200, json={"title": "Bench", "description": "bench", "version": "1.0.0"})
+            if path.endswith("/capabilities"):
+                return httpx.Response(200, json=capabilities)
+            return httpx.Response(200, json={"success": True, "data": data})
+
+    return _Transport()
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    idx = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[idx]
@@ -0,0 +1,79 @@
+# concurrent use() latency while supabase is slow
+#
+#   cd backend && python -m benchmarks.bench_async_db [--db-latency 0.05] [--calls 200]
+#
+# "inline" reproduces the old behaviour (query.execute() on the event loop);
+# "offloaded" is the current run_query path. With inline queries every call
+# serialises behind every other call's database round-trips, so p99 grows with
+# concurrency; offloaded calls overlap and p99 stays close to the db latency
+# until concurrency exceeds the worker pool (settings.db_max_concurrency).
+import argparse
+import asyncio
+import logging
+import time
+
+import httpx
+
+from app.core import database
+from app.extensions import service as ext_service
+from app.mcp import server
+from benchmarks._fakes import FakeSupabase, extension_transport, percentile
+
+
+async def _inline_query(query):
+    return query.execute()
+
+
+async def _uncached_registry() -> dict[str, dict]:
+    rows = (await ext_service.run_query(database.get_supabase().table("extensions").select("*"))).data
+    return {row["name"]: row for row in rows}
+
+
+async def _run(concurrency: int, calls: int) -> list[float]:
+    # fire calls in bursts of `concurrency`, timing each from the burst start
+    latencies: list[float] = []
+
+    async def one(started: float) -> None:
+        await server.use("bench", "ping", {})
+        latencies.append(time.perf_counter() - started)
+
+    for _ in range(max(1, calls // concurrency)):
+        started = time.perf_counter()
+        await asyncio.gather(*(one(started) for _ in range(concurrency)))
+    return latencies
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db-latency", type=float, default=0.05)
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    # force the database path on every call: no registry snapshot and inline
+    # audit inserts, so each use() does two round-trips
+    ext_service._registry = _uncached_registry
+    ext_service._settings.action_log_batching = False
+
+    fake = FakeSupabase(latency=args.db_latency)
+    fake.tables["extensions"] = [{"name": "bench", "url": "http://bench.local", "visibility": "online"}]
+    database._client = fake
+    ext_service._http_client = httpx.AsyncClient(
+        transport=extension_transport([{"name": "ping", "description": "", "parameters": []}], data={"ok": True})
+    )
+
+    print(f"db latency {args.db_latency * 1000:.0f} ms, {args.calls} use() calls per row")
+    print(f"{'mode':<10} {'concurrency':>11} {'p50 ms':>9} {'p99 ms':>9}")
+    for mode in ("inline", "offloaded"):
+        ext_service.run_query = _inline_query if mode == "inline" else database.run_query
+        for concurrency in (1, 5, 10):
+            latencies = await _run(concurrency, args.calls)
+            print(
+                f"{mode:<10} {concurrency:>11} "
+                f"{percentile(latencies, 50) * 1000:>9.1f} {percentile(latencies, 99) * 1000:>9.1f}"
+            )
+    ext_service.run_query = database.run_query
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,75 @@
+# mcp list_extensions: full render vs the cached catalog
+#
+#   cd backend && python -m benchmarks.bench_catalog [--extensions 20] [--actions 15] [--calls 500]
+#
+# capabilities are already in the in-memory cache for both rows, so "render"
+# is the per-call work the tool used to do (registry listing, cache lookups,
+# _format_param on every parameter) and "cached" is the warm path.
+import argparse
+import asyncio
+import logging
+import time
+
+import httpx
+
+from app.core import database
+from app.extensions import service as ext_service
+from app.mcp import server as mcp_server
+from benchmarks._fakes import FakeSupabase, extension_transport, percentile
+
+
+def _capabilities(actions: int) -> list[dict]:
+    return [
+        {
+            "name": f"action_{i}",
+            "description": "does a thing with a few parameters",
+            "parameters": [
+                {"name": "query", "type": "string", "required": True, "description": "what to look for"},
+                {"name": "limit", "type": "integer", "example": 10},
+                {"name": "mode", "type": "string", "enum": ["fast", "full"]},
+            ],
+        }
+        for i in range(actions)
+    ]
+
+
+async def _time_calls(calls: int, force_render: bool) -> list[float]:
+    samples = []
+    for _ in range(calls):
+        if force_render:
+            mcp_server._catalog = None
+        start = time.perf_counter()
+        await mcp_server.list_extensions()
+        samples.append((time.perf_counter() - start) * 1_000_000)
+    return samples
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--extensions", type=int, default=20)
+    parser.add_argument("--actions", type=int, default=15)
+    parser.add_argument("--calls", type=int, default=500)
+    args = parser.parse_args()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    ext_service._settings.tracing_enabled = False
+
+    fake = FakeSupabase()
+    fake.tables["extensions"] = [
+        {"name": f"ext{i:02d}", "title": f"Extension {i}", "description": "bench", "url": f"http://ext{i}.local"}
+        for i in range(args.extensions)
+    ]
+    database._client = fake
+    ext_service._http_client = httpx.AsyncClient(transport=extension_transport(_capabilities(args.actions)))
+    await mcp_server.list_extensions()  # fill the registry and capabilities caches
+
+    text = await mcp_server.list_extensions()
+    print(f"{args.extensions} extensions × {args.actions} actions, {len(text)} chars, {args.calls} calls")
+    print(f"{'path':<8} {'p50 µs':>9} {'p95 µs':>9}")
+    for name, force_render in (("render", True), ("cached", False)):
+        samples = await _time_calls(args.calls, force_render)
+        print(f"{name:<8} {percentile(samples, 50):>9.1f} {percentile(samples, 95):>9.1f}")
+    await ext_service._http_client.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,80 @@
+# page latency at depth: offset/range paging vs keyset (created_at, id) cursors
+#
+#   cd backend && python -m benchmarks.bench_log_pagination [--rows 300000]
+#
+# runs the same two query shapes the log endpoints send to postgrest against an
+# indexed sqlite table, so it works offline. offset pages (and exact counts)
+# walk every skipped row; cursor pages seek straight into the index.
+import argparse
+import sqlite3
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+PAGE = 20
+
+
+def _setup(rows: int) -> sqlite3.Connection:
+    db = sqlite3.connect(":memory:")
+    db.execute(
+        "create table action_logs (id text primary key, extension_name text, action text, created_at text)"
+    )
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    db.executemany(
+        "insert into action_logs values (?, ?, ?, ?)",
+        (
+            (str(uuid.uuid4()), f"ext{i % 8}", "ping", (start + timedelta(seconds=i // 3)).isoformat())
+            for i in range(rows)
+        ),
+    )
+    db.execute("create index action_logs_time_id on action_logs (created_at desc, id desc)")
+    db.commit()
+    return db
+
+
+def _timed(fn, repeat: int = 20) -> tuple[float, list]:
+    best = float("inf")
+    result: list = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=300_000)
+    args = parser.parse_args()
+
+    db = _setup(args.rows)
+    order = "order by created_at desc, id desc"
+    count_ms, _ = _timed(lambda: db.execute("select count(*) from action_logs").fetchall())
+    print(f"{args.rows} rows, page size {PAGE}; exact count costs {count_ms * 1000:.2f} ms per request")
+    print(f"{'depth':>8} {'offset ms':>10} {'cursor ms':>10}")
+
+    for depth in (0, 1_000, 10_000, 100_000, args.rows - PAGE * 2):
+        offset_ms, offset_rows = _timed(
+            lambda: db.execute(f"select * from action_logs {order} limit ? offset ?", (PAGE, depth)).fetchall()
+        )
+        if depth:
+            # the cursor a client would hold after reading `depth` rows
+            created_at, row_id = db.execute(
+                f"select created_at, id from action_logs {order} limit 1 offset ?", (depth - 1,)
+            ).fetchone()
+            cursor_ms, cursor_rows = _timed(
+                lambda: db.execute(
+                    f"select * from action_logs where created_at <= ? and (created_at < ? or id < ?) {order} limit ?",
+                    (created_at, created_at, row_id, PAGE),
+                ).fetchall()
+            )
+        else:
+            cursor_ms, cursor_rows = _timed(
+                lambda: db.execute(f"select * from action_logs {order} limit ?", (PAGE,)).fetchall()
+            )
+        assert offset_rows == cursor_rows
+        print(f"{depth:>8} {offset_ms * 1000:>10.3f} {cursor_ms * 1000:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
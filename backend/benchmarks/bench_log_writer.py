@@ -0,0 +1,59 @@
+# action_logs write throughput: one insert per call vs background batched flushes
+#
+#   cd backend && python -m benchmarks.bench_log_writer [--db-latency 0.02] [--calls 2000]
+#
+# "per-call" awaits a single-row insert inside log_action (action_log_batching
+# off); "batched" queues the row and lets ActionLogWriter bulk-insert. Caller
+# latency is what execute_action / use() would add to the response.
+import argparse
+import asyncio
+import time
+
+from app.core import database
+from app.extensions import service as ext_service
+from benchmarks._fakes import FakeSupabase, percentile
+
+
+async def _run(calls: int, concurrency: int) -> tuple[float, list[float]]:
+    semaphore = asyncio.Semaphore(concurrency)
+    caller: list[float] = []
+
+    async def one(i: int) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            await ext_service.log_action(
+                extension_name="bench", action="ping", params={"i": i}, success=True, source="hub",
+            )
+            caller.append(time.perf_counter() - start)
+
+    ext_service.action_log_writer.start()
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(calls)))
+    await ext_service.action_log_writer.drain()
+    return time.perf_counter() - start, caller
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db-latency", type=float, default=0.02)
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"db latency {args.db_latency * 1000:.0f} ms, {args.calls} rows, concurrency {args.concurrency}")
+    print(f"{'mode':<10} {'rows/s':>9} {'inserts':>8} {'caller p50 ms':>14} {'caller p99 ms':>14}")
+    for mode in ("per-call", "batched"):
+        fake = FakeSupabase(latency=args.db_latency)
+        database._client = fake
+        ext_service._settings.action_log_batching = mode == "batched"
+        elapsed, caller = await _run(args.calls, args.concurrency)
+        written = len(fake.tables.get("action_logs", []))
+        assert written == args.calls, f"{mode}: wrote {written}/{args.calls} rows"
+        print(
+            f"{mode:<10} {written / elapsed:>9.0f} {fake.calls:>8} "
+            f"{percentile(caller, 50) * 1000:>14.3f} {percentile(caller, 99) * 1000:>14.3f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
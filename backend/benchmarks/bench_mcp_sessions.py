@@ -0,0 +1,101 @@
+# per-call overhead of POST /mcp for a trivial tool: stateless vs session mode
+#
+#   cd backend && python -m benchmarks.bench_mcp_sessions [--calls 300] [--concurrency 1]
+#
+# drives the real asgi app (auth, tracing, metrics middleware included) with a
+# no-op tool registered for the run. stateless builds a transport and runs
+# server.run() for every POST; session initializes once and reuses the session.
+import argparse
+import asyncio
+import logging
+import time
+from contextlib import nullcontext
+
+import httpx
+
+from app.core.config import get_settings
+from app.main import app
+from app.mcp import server as mcp_server
+from benchmarks._fakes import percentile
+
+HEADERS = {
+    "authorization": f"Bearer {get_settings().mcp_token}",
+    "accept": "application/json, text/event-stream",
+    "content-type": "application/json",
+}
+
+
+@mcp_server.mcp.tool()
+async def bench_noop() -> str:
+    """Benchmark-only tool that does nothing."""
+    return "ok"
+
+
+def _call(call_id: int) -> dict:
+    return {
+        "jsonrpc": "2.0",
+        "id": call_id,
+        "method": "tools/call",
+        "params": {"name": "bench_noop", "arguments": {}},
+    }
+
+
+async def _initialize(client: httpx.AsyncClient) -> dict:
+    resp = await client.post("/mcp", headers=HEADERS, json={
+        "jsonrpc": "2.0",
+        "id": 0,
+        "method": "initialize",
+        "params": {
+            "protocolVersion": "2025-03-26",
+            "capabilities": {},
+            "clientInfo": {"name": "bench", "version": "0"},
+        },
+    })
+    resp.raise_for_status()
+    headers = {**HEADERS, "mcp-session-id": resp.headers["mcp-session-id"]}
+    await client.post("/mcp", headers=headers, json={"jsonrpc": "2.0", "method": "notifications/initialized"})
+    return headers
+
+
+async def _run(calls: int, concurrency: int, session: bool) -> list[float]:
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        headers = await _initialize(client) if session else HEADERS
+        sem = asyncio.Semaphore(concurrency)
+        samples: list[float] = []
+
+        async def one(i: int) -> None:
+            async with sem:
+                start = time.perf_counter()
+                resp = await client.post("/mcp", headers=headers, json=_call(i))
+                samples.append((time.perf_counter() - start) * 1000)
+                body = resp.json()
+                assert "result" in body, body
+
+        await asyncio.gather(*(one(i) for i in range(calls)))
+        return samples
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=1)
+    args = parser.parse_args()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    logging.getLogger("mcp").setLevel(logging.WARNING)
+
+    print(f"{args.calls} tools/call of a no-op tool, concurrency {args.concurrency}")
+    print(f"{'mode':<10} {'p50 ms':>8} {'p95 ms':>8} {'calls/s':>9}")
+    for mode in ("stateless", "session"):
+        async with mcp_server.mcp_session_manager() if mode == "session" else nullcontext():
+            await _run(20, args.concurrency, mode == "session")  # warm-up
+            start = time.perf_counter()
+            samples = await _run(args.calls, args.concurrency, mode == "session")
+            elapsed = time.perf_counter() - start
+        print(
+            f"{mode:<10} {percentile(samples, 50):>8.2f} {percentile(samples, 95):>8.2f} "
+            f"{args.calls / elapsed:>9.0f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
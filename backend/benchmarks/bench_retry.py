@@ -0,0 +1,99 @@
+# error rate and tail latency of an idempotent action on a flaky, long-tailed host
+#
+#   cd backend && python -m benchmarks.bench_retry [--calls 400]
+#
+# the stub extension resets --fail-rate of connections and answers 3% of
+# requests after 400 ms instead of ~10 ms. compares: no retries, retries with
+# jittered backoff, and retries + p95 hedging. "extra" is upstream requests
+# beyond one per call.
+import argparse
+import asyncio
+import logging
+import random
+import time
+
+import httpx
+
+from app.extensions import service as ext_service
+from app.extensions.retry import RetryStats
+from benchmarks._fakes import percentile
+
+CAPABILITY = {"name": "lookup", "description": "", "idempotent": True}
+
+
+class _FlakyTransport(httpx.AsyncBaseTransport):
+    def __init__(self, fail_rate: float) -> None:
+        self.fail_rate = fail_rate
+        self.requests = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        if random.random() < self.fail_rate:
+            raise httpx.ConnectError("connection reset by peer")
+        await asyncio.sleep(0.4 if random.random() < 0.03 else random.uniform(0.008, 0.012))
+        return httpx.Response(200, json={"success": True, "data": {"ok": True}})
+
+
+async def _run(calls: int, fail_rate: float, retries: int, hedging: bool) -> tuple[list[float], int, int]:
+    settings = ext_service._settings
+    settings.upstream_retries = retries
+    settings.upstream_hedging = hedging
+    ext_service._latency._windows.clear()
+    ext_service._circuits.clear()
+    transport = _FlakyTransport(fail_rate)
+    ext_service._http_client = httpx.AsyncClient(transport=transport)
+
+    # warm the latency window so hedging has a p95 to work from
+    for _ in range(settings.timeout_min_samples):
+        try:
+            await ext_service.proxy_execute("http://flaky.local", "lookup", {}, idempotent=True)
+        except Exception:
+            pass
+    transport.requests = 0
+    ext_service._retry_stats = RetryStats()
+
+    latencies: list[float] = []
+    errors = 0
+    sem = asyncio.Semaphore(8)
+
+    async def one() -> None:
+        nonlocal errors
+        async with sem:
+            start = time.perf_counter()
+            try:
+                await ext_service.run_action("http://flaky.local", "lookup", {}, CAPABILITY)
+            except Exception:
+                errors += 1
+                ext_service._circuits.clear()  # keep one bad streak from failing the rest fast
+                return
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    await asyncio.gather(*(one() for _ in range(calls)))
+    await ext_service._http_client.aclose()
+    return latencies, errors, transport.requests - calls
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=400)
+    parser.add_argument("--fail-rate", type=float, default=0.05)
+    args = parser.parse_args()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    random.seed(7)
+
+    print(f"{args.calls} calls, {args.fail_rate:.0%} connection resets, 3% of answers at 400 ms")
+    print(f"{'policy':<16} {'errors':>7} {'p50 ms':>8} {'p99 ms':>8} {'extra':>6}  counters")
+    for label, retries, hedging in (
+        ("none", 0, False),
+        ("retry", 2, False),
+        ("retry + hedge", 2, True),
+    ):
+        samples, errors, extra = await _run(args.calls, args.fail_rate, retries, hedging)
+        print(
+            f"{label:<16} {errors:>7} {percentile(samples, 50):>8.1f} {percentile(samples, 99):>8.1f} "
+            f"{extra:>6}  {ext_service.retry_stats()}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
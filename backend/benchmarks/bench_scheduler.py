@@ -0,0 +1,71 @@
+# interactive execute latency while a background fan-out saturates the pool
+#
+#   cd backend && python -m benchmarks.bench_scheduler [--slots 8] [--flood 64]
+#
+# a slow extension receives a flood of background get_reminders calls while a
+# fast extension serves interactive executes. "fifo" gives every request one
+# shared queue with no per-extension cap (the old pool behaviour); "lanes"
+# uses the real per-extension limit and interactive-first priority.
+import argparse
+import asyncio
+import logging
+import time
+
+import httpx
+
+from app.extensions import service as ext_service
+from app.extensions.scheduler import BACKGROUND, INTERACTIVE, UpstreamScheduler
+from benchmarks._fakes import percentile
+
+
+class _TwoHostTransport(httpx.AsyncBaseTransport):
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(0.2 if request.url.host == "slow.local" else 0.01)
+        return httpx.Response(200, json={"success": True, "data": []})
+
+
+async def _run(scheduler: UpstreamScheduler, flood: int, interactive: int, fifo: bool) -> list[float]:
+    ext_service._scheduler = scheduler
+    background_lane = INTERACTIVE if fifo else BACKGROUND
+    background = [
+        asyncio.create_task(ext_service.proxy_execute(
+            "http://slow.local", "get_reminders", {"i": i}, lane=background_lane,
+        ))
+        for i in range(flood)
+    ]
+    await asyncio.sleep(0.01)  # let the flood take the slots first
+
+    async def one(i: int) -> float:
+        start = time.perf_counter()
+        await ext_service.proxy_execute("http://fast.local", "lookup", {"i": i})
+        return (time.perf_counter() - start) * 1000
+
+    latencies = await asyncio.gather(*(one(i) for i in range(interactive)))
+    await asyncio.gather(*background)
+    return list(latencies)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--slots", type=int, default=8)
+    parser.add_argument("--per-extension", type=int, default=4)
+    parser.add_argument("--flood", type=int, default=64)
+    parser.add_argument("--interactive", type=int, default=16)
+    args = parser.parse_args()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    ext_service._http_client = httpx.AsyncClient(transport=_TwoHostTransport())
+
+    print(f"{args.slots} slots, {args.flood} background calls to a 200 ms host, "
+          f"{args.interactive} interactive calls to a 10 ms host")
+    print(f"{'mode':<8} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}")
+    for mode, scheduler, fifo in (
+        ("fifo", UpstreamScheduler(args.slots, args.slots), True),
+        ("lanes", UpstreamScheduler(args.slots, args.per_extension), False),
+    ):
+        samples = await _run(scheduler, args.flood, args.interactive, fifo)
+        print(f"{mode:<8} {percentile(samples, 50):>9.1f} {percentile(samples, 95):>9.1f} {max(samples):>9.1f}")
+        print(f"         lanes: {scheduler.stats()['lanes']}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
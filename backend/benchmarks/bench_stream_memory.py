@@ -0,0 +1,123 @@
+# peak hub memory for a multi-megabyte /execute result: buffered vs ?stream=true
+#
+#   cd backend && python -m benchmarks.bench_stream_memory [--mb 8]
+#
+# drives the asgi app directly with a send() that discards body chunks, so only
+# server-side allocations are measured (tracemalloc peak). the stub extension
+# generates its response lazily in 64 KiB chunks.
+import argparse
+import asyncio
+import json
+import logging
+import time
+import tracemalloc
+
+import httpx
+
+from app.core import database
+from app.core.config import get_settings
+from app.extensions import service as ext_service
+from app.main import app
+from benchmarks._fakes import FakeSupabase
+
+CHUNK = 64 * 1024
+
+
+class _LargeBodyTransport(httpx.AsyncBaseTransport):
+    def __init__(self, total_bytes: int) -> None:
+        self.total_bytes = total_bytes
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/capabilities"):
+            return httpx.Response(200, json=[{"name": "export", "description": "", "parameters": []}])
+
+        async def body():
+            yield b'{"success": true, "data": ['
+            row = json.dumps({"id": "x" * 24, "note": "y" * 200}).encode()
+            sent = 0
+            first = True
+            while sent < self.total_bytes:
+                n = CHUNK // (len(row) + 1)
+                piece = (b"" if first else b",") + b",".join([row] * n)
+                first = False
+                sent += len(piece)
+                yield piece
+            yield b"]}"
+
+        return httpx.Response(200, headers={"content-type": "application/json"}, content=body())
+
+
+async def _call(path: str) -> tuple[int, int]:
+    payload = json.dumps({"action": "export", "parameters": {}, "source": "hub"}).encode()
+    received = 0
+    status = 0
+    sent_request = False
+
+    async def receive():
+        nonlocal sent_request
+        if not sent_request:
+            sent_request = True
+            return {"type": "http.request", "body": payload, "more_body": False}
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        nonlocal received, status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            received += len(message.get("body", b""))
+
+    path, _, query = path.partition("?")
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"x-api-key", get_settings().api_key.encode()),
+        ],
+        "client": ("127.0.0.1", 1234),
+        "server": ("bench", 80),
+    }
+    await app(scope, receive, send)
+    return status, received
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mb", type=float, default=8)
+    args = parser.parse_args()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    fake = FakeSupabase()
+    fake.tables["extensions"] = [{"name": "bench", "url": "http://bench.local", "visibility": "online"}]
+    database._client = fake
+    ext_service._http_client = httpx.AsyncClient(transport=_LargeBodyTransport(int(args.mb * 1024 * 1024)))
+    # warm registry + capabilities so they don't count towards the peak
+    await ext_service.fetch_capabilities("http://bench.local")
+    await ext_service.get_extension("bench")
+
+    print(f"~{args.mb:g} MB upstream body")
+    print(f"{'mode':<10} {'status':>6} {'relayed MB':>11} {'peak MB':>9} {'ms':>8}")
+    for mode, path in (
+        ("buffered", "/api/extensions/bench/execute"),
+        ("stream", "/api/extensions/bench/execute?stream=true"),
+    ):
+        tracemalloc.start()
+        start = time.perf_counter()
+        status, received = await _call(path)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{mode:<10} {status:>6} {received / 2**20:>11.2f} {peak / 2**20:>9.2f} {elapsed * 1000:>8.0f}")
+    await ext_service.action_log_writer.drain()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,66 @@
+# result_summary cost on large nested payloads
+#
+#   cd backend && python -m benchmarks.bench_summarize [--records 20000]
+#
+# rest:  json.dumps(data)[:500]           vs  summarize(data)
+# mcp:   json.dumps(data) for the summary  vs  one indent=2 dump shared by the
+#        + json.dumps(data, indent=2)          tool output and truncate()
+import argparse
+import json
+import timeit
+
+from app.extensions.summarize import summarize, truncate
+
+
+def _payload(records: int) -> dict:
+    return {
+        "items": [
+            {
+                "id": f"rec-{i:06d}",
+                "title": f"Record number {i}",
+                "tags": ["alpha", "beta", "gamma"],
+                "meta": {"score": i * 0.5, "active": i % 2 == 0, "notes": "n" * 80},
+            }
+            for i in range(records)
+        ],
+        "total": records,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type=int, default=20_000)
+    args = parser.parse_args()
+    data = _payload(args.records)
+    size = len(json.dumps(data))
+
+    def rest_old():
+        serialized = json.dumps(data, default=str)
+        return serialized[:500] + ("…" if len(serialized) > 500 else "")
+
+    def rest_new():
+        return summarize(data)
+
+    def mcp_old():
+        serialized = json.dumps(data, default=str)
+        summary = serialized[:500] + ("…" if len(serialized) > 500 else "")
+        return summary, json.dumps(data, indent=2, default=str)
+
+    def mcp_new():
+        rendered = json.dumps(data, indent=2, default=str)
+        return truncate(rendered), rendered
+
+    print(f"{args.records} records, {size / 2**20:.1f} MB as json")
+    print(f"{'path':<22} {'ms/call':>10}")
+    for label, fn, n in (
+        ("rest  dumps()[:500]", rest_old, 5),
+        ("rest  summarize()", rest_new, 2000),
+        ("mcp   two dumps", mcp_old, 3),
+        ("mcp   one shared dump", mcp_new, 3),
+    ):
+        per_call = min(timeit.repeat(fn, number=n, repeat=3)) / n
+        print(f"{label:<22} {per_call * 1000:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
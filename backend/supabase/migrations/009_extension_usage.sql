@@ -0,0 +1,57 @@
+-- Per-extension usage summary so list_extensions reads one row per extension
+-- instead of scanning recent action_logs. Kept current by a statement-level
+-- trigger, so a batched insert of N log rows costs one upsert per extension.
+
+create table if not exists extension_usage (
+    extension_name text        primary key,
+    last_used_at   timestamptz not null,
+    call_count     bigint      not null default 0,
+    success_count  bigint      not null default 0,
+    error_count    bigint      not null default 0
+);
+
+create or replace function bump_extension_usage() returns trigger
+language plpgsql as $$
+begin
+    insert into extension_usage as u
+        (extension_name, last_used_at, call_count, success_count, error_count)
+    select
+        extension_name,
+        max(created_at),
+        count(*),
+        count(*) filter (where success),
+        count(*) filter (where not success)
+    from new_rows
+    group by extension_name
+    on conflict (extension_name) do update set
+        last_used_at  = greatest(u.last_used_at, excluded.last_used_at),
+        call_count    = u.call_count    + excluded.call_count,
+        success_count = u.success_count + excluded.success_count,
+        error_count   = u.error_count   + excluded.error_count;
+    return null;
+end;
+$$;
+
+drop trigger if exists action_logs_usage on action_logs;
+create trigger action_logs_usage
+    after insert on action_logs
+    referencing new table as new_rows
+    for each statement
+    execute function bump_extension_usage();
+
+-- backfill from existing logs (safe to re-run: recomputes from scratch)
+insert into extension_usage
+    (extension_name, last_used_at, call_count, success_count, error_count)
+select
+    extension_name,
+    max(created_at),
+    count(*),
+    count(*) filter (where success),
+    count(*) filter (where not success)
+from action_logs
+group by extension_name
+on conflict (extension_name) do update set
+    last_used_at  = excluded.last_used_at,
+    call_count    = excluded.call_count,
+    success_count = excluded.success_count,
+    error_count   = excluded.error_count;
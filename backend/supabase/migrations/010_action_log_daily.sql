@@ -0,0 +1,74 @@
+-- Daily rollups of action_logs per extension / action / source / outcome.
+-- /api/extensions/logs/analytics reads these buckets instead of sampling raw
+-- log rows, so totals are exact for any window. Kept current by a
+-- statement-level trigger; rebuild_action_log_daily() backfills or repairs.
+
+create table if not exists action_log_daily (
+    day            date    not null,   -- utc day of created_at
+    extension_name text    not null,
+    action         text    not null,
+    source         text    not null,
+    success        boolean not null,
+    count          bigint  not null default 0,
+    primary key (day, extension_name, action, source, success)
+);
+
+create index if not exists action_log_daily_ext_day
+    on action_log_daily (extension_name, day);
+
+create or replace function rollup_action_logs() returns trigger
+language plpgsql as $$
+begin
+    insert into action_log_daily as d
+        (day, extension_name, action, source, success, count)
+    select
+        (created_at at time zone 'utc')::date,
+        extension_name,
+        action,
+        source,
+        success,
+        count(*)
+    from new_rows
+    group by 1, 2, 3, 4, 5
+    on conflict (day, extension_name, action, source, success) do update set
+        count = d.count + excluded.count;
+    return null;
+end;
+$$;
+
+drop trigger if exists action_logs_daily_rollup on action_logs;
+create trigger action_logs_daily_rollup
+    after insert on action_logs
+    referencing new table as new_rows
+    for each statement
+    execute function rollup_action_logs();
+
+-- recompute buckets from raw logs (all days, or from `since` onwards).
+-- blocks log inserts for the duration so no rows are counted twice.
+create or replace function rebuild_action_log_daily(since date default null) returns bigint
+language plpgsql as $$
+declare
+    rebuilt bigint;
+begin
+    lock table action_logs in share mode;
+
+    delete from action_log_daily where since is null or day >= since;
+
+    insert into action_log_daily (day, extension_name, action, source, success, count)
+    select
+        (created_at at time zone 'utc')::date,
+        extension_name,
+        action,
+        source,
+        success,
+        count(*)
+    from action_logs
+    where since is null or created_at >= since::timestamp at time zone 'utc'
+    group by 1, 2, 3, 4, 5;
+
+    get diagnostics rebuilt = row_count;
+    return rebuilt;
+end;
+$$;
+
+select rebuild_action_log_daily();
@@ -0,0 +1,6 @@
+-- Keyset pagination for the log endpoints orders by (created_at desc, id desc)
+-- and seeks past the last row of the previous page. Per-extension pages use
+-- action_logs_ext_time; this index serves the unfiltered global feed.
+
+create index if not exists action_logs_time_id
+    on action_logs (created_at desc, id desc);
@@ -0,0 +1,9 @@
+-- Persisted tier of the hub's /capabilities cache. Lets a cold-started
+-- instance serve the last known capabilities immediately (refreshing in the
+-- background) instead of fanning out to every extension first.
+
+create table if not exists capabilities_cache (
+    url          text        primary key,   -- normalized extension base url
+    capabilities jsonb       not null default '[]',
+    fetched_at   timestamptz not null default now()
+);
@@ -0,0 +1,5 @@
+-- Mark action_logs rows that were answered from the hub's result cache
+-- (actions flagged "cacheable" in /capabilities) without calling the extension.
+
+alter table action_logs
+    add column if not exists cache_hit boolean not null default false;
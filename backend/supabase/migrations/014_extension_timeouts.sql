@@ -0,0 +1,7 @@
+-- Per-extension bounds on the hub's adaptive upstream timeouts. Null means the
+-- global timeout_floor_seconds / timeout_ceiling_seconds apply; setting both
+-- to the same value pins a fixed timeout.
+
+alter table extensions
+    add column if not exists min_timeout_seconds real check (min_timeout_seconds > 0),
+    add column if not exists max_timeout_seconds real check (max_timeout_seconds > 0);
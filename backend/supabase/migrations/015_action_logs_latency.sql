@@ -0,0 +1,131 @@
+-- Per-call duration and payload sizes on action_logs, rolled up for analytics.
+--
+-- action_log_daily gains running sums so averages stay exact. Latency
+-- percentiles come from action_log_latency_daily: one row per
+-- (day, extension, action, source, bucket) counting calls whose duration fell
+-- in that bucket. Bucket b holds durations in [bounds[b], bounds[b+1]) ms
+-- with the bounds below (b = width_bucket(duration_ms, bounds)). The backend
+-- mirrors them in LATENCY_BUCKETS_MS, so keep the two in sync.
+
+alter table action_logs
+    add column if not exists duration_ms    integer,
+    add column if not exists request_bytes  integer,
+    add column if not exists response_bytes integer;
+
+alter table action_log_daily
+    add column if not exists duration_count      bigint not null default 0,
+    add column if not exists duration_sum_ms     bigint not null default 0,
+    add column if not exists request_bytes_sum   bigint not null default 0,
+    add column if not exists response_bytes_sum  bigint not null default 0;
+
+create table if not exists action_log_latency_daily (
+    day            date     not null,
+    extension_name text     not null,
+    action         text     not null,
+    source         text     not null,
+    bucket         smallint not null,   -- 0 … 13, see header
+    count          bigint   not null default 0,
+    primary key (day, extension_name, action, source, bucket)
+);
+
+create index if not exists action_log_latency_daily_ext_day
+    on action_log_latency_daily (extension_name, day);
+
+create or replace function action_log_latency_bucket(duration_ms integer) returns smallint
+language sql immutable as $$
+    select width_bucket(
+        duration_ms,
+        array[5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000]
+    )::smallint;
+$$;
+
+create or replace function rollup_action_logs() returns trigger
+language plpgsql as $$
+begin
+    insert into action_log_daily as d
+        (day, extension_name, action, source, success, count,
+         duration_count, duration_sum_ms, request_bytes_sum, response_bytes_sum)
+    select
+        (created_at at time zone 'utc')::date,
+        extension_name,
+        action,
+        source,
+        success,
+        count(*),
+        count(duration_ms),
+        coalesce(sum(duration_ms), 0),
+        coalesce(sum(request_bytes), 0),
+        coalesce(sum(response_bytes), 0)
+    from new_rows
+    group by 1, 2, 3, 4, 5
+    on conflict (day, extension_name, action, source, success) do update set
+        count              = d.count + excluded.count,
+        duration_count     = d.duration_count + excluded.duration_count,
+        duration_sum_ms    = d.duration_sum_ms + excluded.duration_sum_ms,
+        request_bytes_sum  = d.request_bytes_sum + excluded.request_bytes_sum,
+        response_bytes_sum = d.response_bytes_sum + excluded.response_bytes_sum;
+
+    insert into action_log_latency_daily as l
+        (day, extension_name, action, source, bucket, count)
+    select
+        (created_at at time zone 'utc')::date,
+        extension_name,
+        action,
+        source,
+        action_log_latency_bucket(duration_ms),
+        count(*)
+    from new_rows
+    where duration_ms is not null
+    group by 1, 2, 3, 4, 5
+    on conflict (day, extension_name, action, source, bucket) do update set
+        count = l.count + excluded.count;
+    return null;
+end;
+$$;
+
+create or replace function rebuild_action_log_daily(since date default null) returns bigint
+language plpgsql as $$
+declare
+    rebuilt bigint;
+begin
+    lock table action_logs in share mode;
+
+    delete from action_log_daily where since is null or day >= since;
+    delete from action_log_latency_daily where since is null or day >= since;
+
+    insert into action_log_daily
+        (day, extension_name, action, source, success, count,
+         duration_count, duration_sum_ms, request_bytes_sum, response_bytes_sum)
+    select
+        (created_at at time zone 'utc')::date,
+        extension_name,
+        action,
+        source,
+        success,
+        count(*),
+        count(duration_ms),
+        coalesce(sum(duration_ms), 0),
+        coalesce(sum(request_bytes), 0),
+        coalesce(sum(response_bytes), 0)
+    from action_logs
+    where since is null or created_at >= since::timestamp at time zone 'utc'
+    group by 1, 2, 3, 4, 5;
+
+    get diagnostics rebuilt = row_count;
+
+    insert into action_log_latency_daily (day, extension_name, action, source, bucket, count)
+    select
+        (created_at at time zone 'utc')::date,
+        extension_name,
+        action,
+        source,
+        action_log_latency_bucket(duration_ms),
+        count(*)
+    from action_logs
+    where duration_ms is not null
+      and (since is null or created_at >= since::timestamp at time zone 'utc')
+    group by 1, 2, 3, 4, 5;
+
+    return rebuilt;
+end;
+$$;
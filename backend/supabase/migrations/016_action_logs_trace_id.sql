@@ -0,0 +1,10 @@
+-- Trace id of the hub request that produced each action_logs row. Matches the
+-- x-trace-id response header, the traceparent sent to the extension, and
+-- /api/traces?trace_id=… while the trace is still in the hub's ring buffer.
+
+alter table action_logs
+    add column if not exists trace_id text;
+
+create index if not exists action_logs_trace_id
+    on action_logs (trace_id)
+    where trace_id is not null;
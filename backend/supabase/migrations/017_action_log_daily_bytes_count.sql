@@ -0,0 +1,108 @@
+-- Separate counts of rows that carry request / response byte sizes.
+--
+-- Failed calls and batch items log request_bytes without a duration, so the
+-- byte averages can't share duration_count as their denominator. Existing
+-- rows start at 0; run select rebuild_action_log_daily(); to backfill them.
+
+alter table action_log_daily
+    add column if not exists request_bytes_count  bigint not null default 0,
+    add column if not exists response_bytes_count bigint not null default 0;
+
+create or replace function rollup_action_logs() returns trigger
+language plpgsql as $$
+begin
+    insert into action_log_daily as d
+        (day, extension_name, action, source, success, count,
+         duration_count, duration_sum_ms, request_bytes_sum, response_bytes_sum,
+         request_bytes_count, response_bytes_count)
+    select
+        (created_at at time zone 'utc')::date,
+        extension_name,
+        action,
+        source,
+        success,
+        count(*),
+        count(duration_ms),
+        coalesce(sum(duration_ms), 0),
+        coalesce(sum(request_bytes), 0),
+        coalesce(sum(response_bytes), 0),
+        count(request_bytes),
+        count(response_bytes)
+    from new_rows
+    group by 1, 2, 3, 4, 5
+    on conflict (day, extension_name, action, source, success) do update set
+        count                = d.count + excluded.count,
+        duration_count       = d.duration_count + excluded.duration_count,
+        duration_sum_ms      = d.duration_sum_ms + excluded.duration_sum_ms,
+        request_bytes_sum    = d.request_bytes_sum + excluded.request_bytes_sum,
+        response_bytes_sum   = d.response_bytes_sum + excluded.response_bytes_sum,
+        request_bytes_count  = d.request_bytes_count + excluded.request_bytes_count,
+        response_bytes_count = d.response_bytes_count + excluded.response_bytes_count;
+
+    insert into action_log_latency_daily as l
+        (day, extension_name, action, source, bucket, count)
+    select
+        (created_at at time zone 'utc')::date,
+        extension_name,
+        action,
+        source,
+        action_log_latency_bucket(duration_ms),
+        count(*)
+    from new_rows
+    where duration_ms is not null
+    group by 1, 2, 3, 4, 5
+    on conflict (day, extension_name, action, source, bucket) do update set
+        count = l.count + excluded.count;
+    return null;
+end;
+$$;
+
+create or replace function rebuild_action_log_daily(since date default null) returns bigint
+language plpgsql as $$
+declare
+    rebuilt bigint;
+begin
+    lock table action_logs in share mode;
+
+    delete from action_log_daily where since is null or day >= since;
+    delete from action_log_latency_daily where since is null or day >= since;
+
+    insert into action_log_daily
+        (day, extension_name, action, source, success, count,
+         duration_count, duration_sum_ms, request_bytes_sum, response_bytes_sum,
+         request_bytes_count, response_bytes_count)
+    select
+        (created_at at time zone 'utc')::date,
+        extension_name,
+        action,
+        source,
+        success,
+        count(*),
+        count(duration_ms),
+        coalesce(sum(duration_ms), 0),
+        coalesce(sum(request_bytes), 0),
+        coalesce(sum(response_bytes), 0),
+        count(request_bytes),
+        count(response_bytes)
+    from action_logs
+    where since is null or created_at >= since::timestamp at time zone 'utc'
+    group by 1, 2, 3, 4, 5;
+
+    get diagnostics rebuilt = row_count;
+
+    insert into action_log_latency_daily (day, extension_name, action, source, bucket, count)
+    select
+        (created_at at time zone 'utc')::date,
+        extension_name,
+        action,
+        source,
+        action_log_latency_bucket(duration_ms),
+        count(*)
+    from action_logs
+    where duration_ms is not null
+      and (since is null or created_at >= since::timestamp at time zone 'utc')
+    group by 1, 2, 3, 4, 5;
+
+    return rebuilt;
+end;
+$$;
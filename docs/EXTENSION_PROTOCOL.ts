@@ -177,7 +177,9 @@ export interface ExtensionCapabilityParameter {
   name: string;
   /**
    * JSON-style type hint for the AI agent.
-   * Use plain strings: "string" | "number" | "boolean" | "object" | "array"
+   * Use plain strings: "string" | "number" | "integer" | "boolean" | "object" | "array"
+   * The hub rejects calls that break `type`, `required` or `enum` before they
+   * reach /execute; any other type string is passed through unchecked.
    */
   type: string;
   /** Whether the parameter is required for this action */
@@ -206,6 +208,30 @@ export interface ExtensionCapability {
   description: string;
   /** Parameters the action accepts. Omit or use [] if there are none. */
   parameters?: ExtensionCapabilityParameter[];
+  /**
+   * Optional: true if the action only reads data and has no side effects.
+   * The hub may then share one /execute call between identical concurrent
+   * requests (same action + parameters) instead of sending each upstream.
+   */
+  read_only?: boolean;
+  /**
+   * Optional: true if sending the same call twice has the same effect as
+   * sending it once (e.g. "set status to X", or an upsert keyed by a
+   * client-supplied id). The hub may then retry the action after a
+   * connection error or 502/503/504, and may send a second copy if the
+   * first is unusually slow. read_only actions are treated as idempotent.
+   * Leave unset for anything that must not run twice, such as "add_expense".
+   */
+  idempotent?: boolean;
+  /**
+   * Optional: true if the hub may cache successful results of this action
+   * (keyed by action + parameters) and answer repeats without calling
+   * /execute. Any successful call to an action that is neither read_only nor
+   * cacheable clears this extension's cached results.
+   */
+  cacheable?: boolean;
+  /** Optional: how long a cached result stays valid, in seconds. Default 60. */
+  cache_ttl_seconds?: number;
 }
 
 /**
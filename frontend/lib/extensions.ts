@@ -13,6 +13,24 @@ export interface Extension {
   supabase_url?: string | null;
   vercel_url?: string | null;
   last_used_at?: string | null;
+  call_count?: number;
+  success_count?: number;
+  error_count?: number;
+  health?: {
+    state: "closed" | "open" | "half_open";
+    consecutive_failures: number;
+    opened_at: string | null;
+    last_error: string | null;
+  };
+  // per-operation ("info", "capabilities", "execute", "execute:<action>")
+  latency_budgets?: Record<string, {
+    samples: number;
+    p50_ms: number | null;
+    p99_ms: number | null;
+    timeout_seconds: number;
+  }>;
+  min_timeout_seconds?: number | null;
+  max_timeout_seconds?: number | null;
   visibility?: string | null;
 }
 
@@ -213,6 +231,26 @@ export interface ActionLog {
   result_summary: string | null;
   source: string;
   created_at: string;
+  cache_hit?: boolean;
+  duration_ms?: number | null;
+  request_bytes?: number | null;
+  response_bytes?: number | null;
+  trace_id?: string | null;
+}
+
+export interface LatencyStats {
+  calls: number;
+  avg_ms: number | null;
+  p50_ms: number | null;
+  p95_ms: number | null;
+  p99_ms: number | null;
+}
+
+export interface ActionLatencyStats extends LatencyStats {
+  extension: string;
+  action: string;
+  avg_request_bytes: number | null;
+  avg_response_bytes: number | null;
 }
 
 export interface ActionLogAnalytics {
@@ -233,6 +271,12 @@ export interface ActionLogAnalytics {
   top_actions: { action: string; count: number }[];
   top_extensions: { extension: string; count: number }[];
   daily: { date: string; total: number; success: number; error: number }[];
+  latency?: {
+    overall: LatencyStats;
+    by_extension: (LatencyStats & { extension: string })[];
+    by_action: ActionLatencyStats[];
+    slowest_actions: ActionLatencyStats[];
+  };
 }
 
 export async function getActionLogs(